@@ -4,14 +4,17 @@ echo =========================
 echo.
 
 set LOG_FILE="C:\ChromeExtensions\Claude             hooks\claude-notifier\hooks\events.log"
+set LOG_VIEWER="C:\ChromeExtensions\Claude             hooks\claude-notifier\log_viewer.py"
 
 if exist %LOG_FILE% (
     echo Recent log entries:
     echo -------------------
-    powershell -Command "Get-Content %LOG_FILE% -Tail 20"
+    rem Reads only the end of the file, fast even for very large logs
+    python %LOG_VIEWER% --file %LOG_FILE% -n 20
     echo.
     echo -------------------
     echo Full log file: %LOG_FILE%
+    echo Follow live: python %LOG_VIEWER% --follow [--level WARNING] [--event Stop] [--tool Bash]
 ) else (
     echo No log file found yet.
     echo Run some Claude Code commands to generate logs.
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Hook Hot-Path Microbenchmarks
+=============================
+Times the functions every hook invocation and every tray message goes
+through, stores the results as a JSON baseline, and fails when a tracked
+metric regresses beyond a tolerance.
+
+    python bench_hooks.py --save               # record bench/baselines.json
+    python bench_hooks.py                      # compare against it (exit 1 on regression)
+    python bench_hooks.py --tolerance 0.5 --filter json_load
+
+Covered:
+- log_event() at each level, for both hook handlers (logs go to a temp dir)
+- json.load of hook payloads from 1 KB to 10 MB
+- send_status_to_tray() and get_logging_config() against a local stub
+  listener (tray up) and a closed port (tray down). These use the root
+  handler, whose transport is a plain socket
+- The WSL handler's fast lane: extract_fields() on 1 KB and 1 MB payloads,
+  send_direct(), deliver_status() and the route-cached get_logging_config(),
+  with the tray up and down (tray down is the cached "bridge" route; the
+  PostToolUse it delivers is skipped rather than spawning PowerShell)
+- ClaudeTrayApp.handle_message() for status, JSON event and get_config
+  messages, and create_icon_image() when Pillow is installed
+
+Baselines are machine specific, record them on the machine you compare on.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import contextlib
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+REPO = ROOT.parent
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_TOLERANCE = 0.25  # Allowed slowdown, as a fraction of the baseline
+TARGET_TIME = 0.2  # Seconds per repeat
+REPEATS = 5
+
+sys.path.insert(0, str(ROOT / "tray"))
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(func):
+    """Best time per call in microseconds, auto-calibrating the loop count"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= TARGET_TIME / 10 or number >= 1_000_000:
+            break
+        number *= 10
+    number = max(1, int(number * (TARGET_TIME / max(elapsed, 1e-9))))
+    best = None
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call = (time.perf_counter() - started) / number
+        best = per_call if best is None else min(best, per_call)
+    return best * 1e6
+
+
+def make_payload(size):
+    """A PreToolUse payload padded to roughly `size` bytes"""
+    payload = {
+        "session_id": "bench-session",
+        "transcript_path": "/tmp/bench.jsonl",
+        "hook_event_name": "PreToolUse",
+        "tool_name": "Write",
+        "tool_input": {"file_path": "/tmp/bench.txt", "content": ""},
+        # After tool_input, as Claude Code sends it: extract_fields scans the whole payload
+        "tool_use_id": "toolu_bench",
+    }
+    padding = size - len(json.dumps(payload))
+    payload["tool_input"]["content"] = "x" * max(0, padding)
+    return json.dumps(payload)
+
+
+class StubTray:
+    """Minimal tray listener: accepts, answers get_config, closes"""
+
+    def __init__(self):
+        self.server = socket.socket()
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(64)
+        self.port = self.server.getsockname()[1]
+        self.running = True
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while self.running:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            with client:
+                data = client.recv(4096)
+                if data == b"get_config":
+                    client.sendall(b'{"logging_enabled": true}')
+
+    def close(self):
+        self.running = False
+        self.server.close()
+
+
+def closed_port():
+    """A port with nothing listening on it"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class FakeClient:
+    def send(self, data):
+        return len(data)
+
+
+def hook_benchmarks(tmp):
+    root = load_module("bench_root_hook", REPO / "hooks" / "hook_handler.py")
+    wsl = load_module("bench_wsl_hook", ROOT / "hooks" / "hook_handler.py")
+    # Keep benchmark log lines out of the real events.log files
+    root.__file__ = os.path.join(tmp, "hook_handler.py")
+    wsl.HOOK_DIR = tmp
+    event = json.loads(make_payload(1024))
+
+    benches = {}
+    for level in ("DEBUG", "INFO", "WARNING", "ERROR"):
+        benches[f"root.log_event.{level}"] = lambda level=level: root.log_event(event, "bench", level)
+        benches[f"wsl.log_event.{level}"] = lambda level=level: wsl.log_event(event, "bench", level)
+
+    def disabled_log():
+        wsl.LOGGING_ENABLED = False
+        try:
+            wsl.log_event(event, "bench", "INFO")
+        finally:
+            wsl.LOGGING_ENABLED = True
+    benches["wsl.log_event.disabled"] = disabled_log
+
+    for label, size in (("1KB", 1024), ("100KB", 100 * 1024), ("1MB", 1024 ** 2), ("10MB", 10 * 1024 ** 2)):
+        text = make_payload(size)
+        benches[f"json_load.{label}"] = lambda text=text: json.load(io.StringIO(text))
+
+    stub = StubTray()
+    down_port = closed_port()
+
+    def with_port(func, port):
+        def run():
+            root.TRAY_PORT = port
+            func()
+        return run
+
+    benches["root.send_status_to_tray.tray_up"] = with_port(lambda: root.send_status_to_tray("working"), stub.port)
+    benches["root.send_status_to_tray.tray_down"] = with_port(lambda: root.send_status_to_tray("working"), down_port)
+    benches["root.get_logging_config.tray_up"] = with_port(root.get_logging_config, stub.port)
+    benches["root.get_logging_config.tray_down"] = with_port(root.get_logging_config, down_port)
+
+    for label, size in (("1KB", 1024), ("1MB", 1024 ** 2)):
+        text = make_payload(size)
+        benches[f"wsl.extract_fields.{label}"] = lambda text=text: wsl.extract_fields(text)
+
+    # Each scenario keeps its own route cache; probes stay on localhost
+    wsl.windows_host_ip = lambda: "127.0.0.1"
+    wsl.TRAY_DISABLED = False
+    fields = wsl.extract_fields(make_payload(1024))
+    post_fields = {**fields, "hook_event_name": "PostToolUse"}
+    message = wsl.build_tray_message("working", fields)
+
+    def with_route(func, port, scenario):
+        route_file = os.path.join(tmp, f".tray_route_{scenario}")
+
+        def run():
+            wsl.TRAY_PORT = port
+            wsl.ROUTE_FILE = route_file
+            func()
+        return run
+
+    for scenario, port in (("tray_up", stub.port), ("tray_down", down_port)):
+        benches[f"wsl.send_direct.{scenario}"] = with_route(lambda: wsl.send_direct(message), port, scenario)
+        benches[f"wsl.deliver_status.{scenario}"] = with_route(
+            lambda: wsl.deliver_status("working", post_fields), port, scenario)
+        benches[f"wsl.get_logging_config.{scenario}"] = with_route(wsl.get_logging_config, port, scenario)
+    return benches, stub.close
+
+
+def tray_benchmarks(tmp):
+    import claude_tray_with_volume as tray
+
+    # Keep the app from touching the real config, status and state files. With no
+    # config.json in the temp dir, webhooks and span export stay disabled
+    state_dir = Path(tmp) / "tray"
+    state_dir.mkdir()
+    tray.CURRENT_DIR = state_dir
+    tray.STATE_FILE = state_dir / "tray_state.bin"
+    tray.TRANSCRIPT_STATE_FILE = state_dir / "transcripts.json"
+    app = tray.ClaudeTrayApp(headless=True, port=0)
+    app.save_config = lambda: None
+    app.stream.status_file = None
+    client = FakeClient()
+    state = {"next": "working"}
+
+    def status_message():
+        app.handle_message(state["next"], client)
+        state["next"] = "standby" if state["next"] == "working" else "working"
+
+    event = json.dumps({"status": "working", "event": "PreToolUse", "session_id": "bench", "tool": "Bash"})
+    benches = {
+        "tray.handle_message.status": status_message,
+        "tray.handle_message.event": lambda: app.handle_message(event, client),
+        "tray.handle_message.get_config": lambda: app.handle_message("get_config", client),
+    }
+
+    try:
+        tray.load_gui_modules()
+        benches["tray.create_icon_image"] = lambda: app.create_icon_image((0, 255, 0))
+    except ImportError:
+        print("Pillow/pystray not installed, skipping tray.create_icon_image")
+    return benches
+
+
+def run_benchmarks(name_filter):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        benches, cleanup = hook_benchmarks(tmp)
+        benches.update(tray_benchmarks(tmp))
+        try:
+            for name, func in benches.items():
+                if name_filter and name_filter not in name:
+                    continue
+                # Handlers and the tray print status lines; keep the report readable
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                        contextlib.redirect_stderr(devnull):
+                    us = measure(func)
+                results[name] = {"us_per_op": round(us, 3)}
+                print(f"{name:<40} {us:12.2f} us")
+        finally:
+            cleanup()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the comparison and return the names of regressed metrics"""
+    regressions = []
+    print()
+    print(f"{'metric':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:<40} {'-':>12} {result['us_per_op']:12.2f}       new")
+            continue
+        change = result["us_per_op"] / base["us_per_op"] - 1
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {base['us_per_op']:12.2f} {result['us_per_op']:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for hook and tray hot paths")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help=f"baseline file (default {BASELINE_FILE})")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed slowdown as a fraction (default {DEFAULT_TOLERANCE})")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter)
+
+    if args.save:
+        baseline = {
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "results": results,
+        }
+        if args.filter and os.path.exists(args.baseline):
+            # Partial runs update only the metrics they measured
+            with open(args.baseline, "r") as f:
+                previous = json.load(f)
+            baseline["results"] = {**previous.get("results", {}), **results}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save first")
+        return
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} metric(s) regressed more than {args.tolerance:.0%}")
+        sys.exit(1)
+    print(f"\nOK: no metric regressed more than {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Tray Socket Server Stress / Soak Suite
+======================================
+Runs ClaudeTrayApp (GUI mode, with fake pystray/PIL/pygame backends) in
+this process and hits its listener with N concurrent clients sending
+status updates and get_config requests at a configurable rate.
+
+Reports accept throughput, latency percentiles, refused connections and
+file-descriptor / thread counts sampled over the run, so long soaks show
+leaks. Runs on plain Linux; no GUI or audio libraries needed.
+
+Examples:
+    python stress_tray.py --clients 20 --duration 10
+    python stress_tray.py --clients 4 --rate 5 --duration 3600 --report soak.json
+    python stress_tray.py --compare soak.json --report soak2.json
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import types
+import socket
+import random
+import tempfile
+import argparse
+import platform
+import threading
+import contextlib
+from pathlib import Path
+
+TRAY_DIR = Path(__file__).resolve().parent.parent / "tray"
+sys.path.insert(0, str(TRAY_DIR))
+
+
+class FakeIcon:
+    """Stand-in for pystray.Icon: run() blocks until stop()"""
+
+    def __init__(self, name, icon=None, title=None, menu=None):
+        self.name = name
+        self.icon = icon
+        self.title = title
+        self.menu = menu
+        self.notifications = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        self._stopped.wait()
+
+    def stop(self):
+        self._stopped.set()
+
+    def notify(self, message, title=None):
+        self.notifications += 1
+
+
+class FakeImage:
+    def ellipse(self, *args, **kwargs):
+        pass
+
+
+def install_fake_backends():
+    """Register fake pystray, PIL and pygame modules in sys.modules"""
+    pystray = types.ModuleType("pystray")
+    pystray.Icon = FakeIcon
+    pystray.Menu = lambda *items: list(items)
+    pystray.MenuItem = lambda *args, **kwargs: args
+    pystray.Menu.SEPARATOR = None
+
+    pil = types.ModuleType("PIL")
+    pil.Image = types.SimpleNamespace(new=lambda *args, **kwargs: FakeImage())
+    pil.ImageDraw = types.SimpleNamespace(Draw=lambda image: image)
+
+    class FakeSound:
+        def __init__(self, path):
+            pass
+
+        def set_volume(self, volume):
+            pass
+
+        def play(self):
+            pass
+
+    pygame = types.ModuleType("pygame")
+    pygame.mixer = types.SimpleNamespace(init=lambda: None, Sound=FakeSound)
+
+    sys.modules.update({"pystray": pystray, "PIL": pil, "pygame": pygame})
+
+
+def count_fds():
+    """Open file descriptors of this process (None where /proc is unavailable)"""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ClientStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.ok = 0
+        self.refused = 0
+        self.resets = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def record(self, outcome, latency=None):
+        with self.lock:
+            if outcome == "ok":
+                self.ok += 1
+                self.latencies.append(latency)
+            else:
+                setattr(self, outcome, getattr(self, outcome) + 1)
+
+
+def one_request(port, message, timeout):
+    """Send one message and wait for the server to close; returns latency in ms"""
+    started = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as s:
+        s.sendall(message)
+        s.shutdown(socket.SHUT_WR)
+        while s.recv(4096):
+            pass
+    return (time.perf_counter() - started) * 1000
+
+
+def client_loop(port, stats, stop_event, rate, config_ratio, timeout, seed):
+    """One simulated hook client, sending at `rate` requests/s (0 = flat out)"""
+    rng = random.Random(seed)
+    status = b"working"
+    interval = 1.0 / rate if rate > 0 else 0
+    next_send = time.perf_counter()
+    while not stop_event.is_set():
+        if rng.random() < config_ratio:
+            message = b"get_config"
+        else:
+            message = status
+            status = b"standby" if status == b"working" else b"working"
+        try:
+            stats.record("ok", one_request(port, message, timeout))
+        except ConnectionRefusedError:
+            stats.record("refused")
+        except ConnectionResetError:
+            stats.record("resets")
+        except socket.timeout:
+            stats.record("timeouts")
+        except OSError:
+            stats.record("errors")
+
+        if interval:
+            next_send += interval
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                stop_event.wait(delay)
+            else:
+                next_send = time.perf_counter()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port):
+    """Start ClaudeTrayApp with the fake backends; returns (app, tray_thread)"""
+    install_fake_backends()
+    import claude_tray_with_volume as tray
+
+    # Keep the app from touching the real config, status and state files. With no
+    # config.json in the temp dir, webhooks and span export stay disabled
+    state_dir = Path(tempfile.mkdtemp())
+    tray.CURRENT_DIR = state_dir
+    tray.STATE_FILE = state_dir / "tray_state.bin"
+    tray.STATUS_FILE = state_dir / "status.json"
+    tray.TRANSCRIPT_STATE_FILE = state_dir / "transcripts.json"
+    app = tray.ClaudeTrayApp(port=port)
+    app.save_config = lambda: None
+    tray_thread = threading.Thread(target=app.run, daemon=True)
+    tray_thread.start()
+    if not app.listener_ready.wait(timeout=5):
+        raise RuntimeError(f"tray listener did not start on port {port}")
+    return app, tray_thread
+
+
+def run_stress(args):
+    port = args.port or free_port()
+    sink = io.StringIO()
+    samples = []
+
+    with contextlib.redirect_stdout(sink):
+        app, tray_thread = start_app(port)
+        time.sleep(0.2)
+        baseline = {"fds": count_fds(), "threads": threading.active_count()}
+
+        stats = ClientStats()
+        stop_event = threading.Event()
+        clients = [
+            threading.Thread(target=client_loop, daemon=True,
+                             args=(port, stats, stop_event, args.rate, args.config_ratio,
+                                   args.timeout, args.seed + i))
+            for i in range(args.clients)
+        ]
+        started = time.perf_counter()
+        messages_before = app.metrics["messages"]
+        for thread in clients:
+            thread.start()
+
+        deadline = started + args.duration
+        while time.perf_counter() < deadline:
+            time.sleep(min(args.sample_interval, max(0, deadline - time.perf_counter())))
+            with stats.lock:
+                completed = stats.ok
+            samples.append({
+                "t": round(time.perf_counter() - started, 2),
+                "fds": count_fds(),
+                "threads": threading.active_count(),
+                "completed": completed,
+                "queue_depth": app.effects.depth(),
+            })
+
+        stop_event.set()
+        for thread in clients:
+            thread.join(timeout=args.timeout + 1)
+        elapsed = time.perf_counter() - started
+        accepted = app.metrics["messages"] - messages_before
+
+        # Let the server settle, then measure what is left open
+        time.sleep(0.5)
+        after = {"fds": count_fds(), "threads": threading.active_count()}
+        server_metrics = app.get_metrics()
+        app.exit_app(app.icon, None)
+        tray_thread.join(timeout=3)
+
+    latencies = sorted(stats.latencies)
+    fd_growth = (after["fds"] - baseline["fds"]) if baseline["fds"] is not None else None
+    thread_growth = after["threads"] - baseline["threads"]
+    return {
+        "config": {
+            "clients": args.clients,
+            "rate_per_client": args.rate,
+            "duration_s": args.duration,
+            "config_ratio": args.config_ratio,
+            "timeout_s": args.timeout,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": {
+            "elapsed_s": round(elapsed, 2),
+            "requests_ok": stats.ok,
+            "accepted": accepted,
+            "accept_throughput_per_s": round(accepted / elapsed, 1),
+            "refused": stats.refused,
+            "resets": stats.resets,
+            "timeouts": stats.timeouts,
+            "errors": stats.errors,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 3) if latencies else None,
+                "p95": round(percentile(latencies, 95), 3) if latencies else None,
+                "p99": round(percentile(latencies, 99), 3) if latencies else None,
+                "max": round(latencies[-1], 3) if latencies else None,
+            },
+            "server_errors": server_metrics["errors"],
+            "side_effects_dropped": server_metrics["side_effects"]["dropped"],
+        },
+        "leaks": {
+            "fds_before": baseline["fds"],
+            "fds_after": after["fds"],
+            "fd_growth": fd_growth,
+            "threads_before": baseline["threads"],
+            "threads_after": after["threads"],
+            "thread_growth": thread_growth,
+            "leak_suspected": bool((fd_growth or 0) > args.leak_threshold
+                                   or thread_growth > args.leak_threshold),
+        },
+        "samples": samples,
+    }
+
+
+def print_report(report, previous=None):
+    results = report["results"]
+    leaks = report["leaks"]
+    config = report["config"]
+
+    def delta(section, key):
+        if not previous:
+            return ""
+        old = previous.get(section, {}).get(key)
+        new = report[section].get(key)
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)) and old:
+            return f"  ({(new - old) / old * 100:+.1f}% vs previous)"
+        return ""
+
+    print("Tray listener stress report")
+    print("===========================")
+    print(f"Clients: {config['clients']}  Rate: {config['rate_per_client'] or 'max'}/s each  "
+          f"Duration: {config['duration_s']}s")
+    print(f"Requests OK:        {results['requests_ok']}")
+    print(f"Accept throughput:  {results['accept_throughput_per_s']}/s"
+          f"{delta('results', 'accept_throughput_per_s')}")
+    for key in ("p50", "p95", "p99", "max"):
+        value = results["latency_ms"][key]
+        old = (previous or {}).get("results", {}).get("latency_ms", {}).get(key)
+        change = f"  ({(value - old) / old * 100:+.1f}% vs previous)" if value and old else ""
+        print(f"Latency {key:<4}        {value} ms{change}")
+    print(f"Refused / resets / timeouts / errors: {results['refused']} / {results['resets']} / "
+          f"{results['timeouts']} / {results['errors']}")
+    print(f"Server errors: {results['server_errors']}  Side effects dropped: {results['side_effects_dropped']}")
+    print(f"FDs:     {leaks['fds_before']} -> {leaks['fds_after']}")
+    print(f"Threads: {leaks['threads_before']} -> {leaks['threads_after']}")
+    if leaks["leak_suspected"]:
+        print("WARNING: resource growth above threshold, possible leak")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress / soak test for the tray socket server")
+    parser.add_argument("--clients", type=int, default=10, help="concurrent clients (default 10)")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="requests per second per client, 0 = as fast as possible")
+    parser.add_argument("--duration", type=float, default=10, help="run time in seconds (default 10)")
+    parser.add_argument("--config-ratio", type=float, default=0.2,
+                        help="fraction of requests that are get_config (default 0.2)")
+    parser.add_argument("--timeout", type=float, default=2.0, help="client socket timeout in seconds")
+    parser.add_argument("--sample-interval", type=float, default=1.0,
+                        help="seconds between fd/thread samples (default 1)")
+    parser.add_argument("--leak-threshold", type=int, default=5,
+                        help="fd/thread growth that counts as a leak (default 5)")
+    parser.add_argument("--port", type=int, default=0, help="listener port (default: a free port)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--report", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            previous = json.load(f)
+
+    report = run_stress(args)
+    print_report(report, previous)
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    sys.exit(1 if report["leaks"]["leak_suspected"] else 0)
+
+
+if __name__ == "__main__":
+    main()
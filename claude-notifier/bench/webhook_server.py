@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Webhook Stand-in Server
+=======================
+A local HTTP server that records what the tray's webhook dispatcher posts,
+so batching, keep-alive reuse and retries can be checked without a real
+chat or incident service.
+
+--check runs WebhookDispatcher (tray/webhooks.py) against it in this
+process and verifies that:
+- events dispatched within a batch window arrive as one request
+- later batches reuse the same keep-alive connection
+- a 500 response is retried, and the error clears once a retry succeeds
+- a 400 response is not retried
+
+Without --check it serves until interrupted and prints each request, for
+pointing a running tray at it:
+
+    "webhooks": [{"url": "http://127.0.0.1:8099/hook", "events": ["*"]}]
+
+Examples:
+    python webhook_server.py --check
+    python webhook_server.py --port 8099
+    python webhook_server.py --port 8099 --fail 2 --status 503
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "tray"))
+
+CHECK_TIMEOUT = 5.0  # Seconds to wait for the dispatcher in --check
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, verbose=False):
+        super().__init__(("127.0.0.1", port), StandInHandler)
+        self.port = self.server_address[1]
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.requests = []  # {'connection', 'path', 'status', 'events'}
+        self.connections = 0
+        self.fail = []  # Statuses to answer the next requests with
+
+    def fail_next(self, count, status):
+        with self.lock:
+            self.fail.extend([status] * count)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the endpoints the dispatcher talks to
+
+    def setup(self):
+        super().setup()
+        # One handler instance serves every request on a connection
+        with self.server.lock:
+            self.server.connections += 1
+            self.connection_id = self.server.connections
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = {}
+        events = len(payload['events']) if 'events' in payload else len(payload.get('text', '').splitlines())
+        with self.server.lock:
+            status = self.server.fail.pop(0) if self.server.fail else 200
+            self.server.requests.append({'connection': self.connection_id, 'path': self.path,
+                                         'status': status, 'events': events})
+        if self.server.verbose:
+            print(f"connection {self.connection_id} POST {self.path}: {events} events -> {status}")
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def wait_until(predicate, timeout=CHECK_TIMEOUT):
+    """Poll until predicate() is true, returns whether it became true"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def run_check():
+    """Run the dispatcher against a stand-in server, returns the failed checks"""
+    from webhooks import WebhookDispatcher
+
+    server = StandInServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    dispatcher = WebhookDispatcher([{'url': f"http://127.0.0.1:{server.port}/hook", 'events': ['*'],
+                                     'batch_window': 0.2, 'max_batch': 5}], backoff=0.05)
+    destination = dispatcher.destinations[0]
+    dispatcher.start()
+    failures = []
+
+    def batches_done(count):
+        """Wait until the dispatcher has finished `count` batches, sent or failed"""
+        wait_until(lambda: destination.stats['sent_batches'] + destination.stats['failed_batches'] >= count)
+
+    def check(name, ok, detail=""):
+        print(f"{'ok  ' if ok else 'FAIL'} {name}{f' ({detail})' if detail else ''}")
+        if not ok:
+            failures.append(name)
+
+    try:
+        for i in range(5):
+            dispatcher.dispatch({'event': 'Stop', 'session_id': f"session-{i}"})
+        batches_done(1)
+        check("full batch sent as one request", [r['events'] for r in server.requests] == [5],
+              f"requests {[r['events'] for r in server.requests]}")
+
+        for i in range(3):
+            dispatcher.dispatch({'event': 'Notification', 'session_id': f"session-{i}"})
+        batches_done(2)
+        check("partial batch sent after the window", [r['events'] for r in server.requests[1:]] == [3])
+        check("keep-alive connection reused", server.connections == 1 and destination.stats['connections'] == 1,
+              f"server saw {server.connections}, dispatcher opened {destination.stats['connections']}")
+
+        server.fail_next(1, 500)
+        dispatcher.dispatch({'event': 'Stop'})
+        batches_done(3)
+        check("500 retried", [r['status'] for r in server.requests[2:]] == [500, 200]
+              and destination.stats['retries'] == 1, f"retries {destination.stats['retries']}")
+        check("error cleared after a successful retry", destination.stats['last_error'] is None,
+              f"last_error {destination.stats['last_error']!r}")
+
+        server.fail_next(1, 400)
+        dispatcher.dispatch({'event': 'Stop'})
+        batches_done(4)
+        time.sleep(0.3)  # Longer than a retry would take
+        check("400 not retried", len(server.requests) == 5 and destination.stats['failed_batches'] == 1,
+              f"{len(server.requests)} requests, {destination.stats['failed_batches']} failed batches")
+    finally:
+        dispatcher.stop()
+        server.shutdown()
+        server.server_close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in HTTP server for the webhook dispatcher")
+    parser.add_argument("--check", action="store_true", help="run the dispatcher against it and verify delivery")
+    parser.add_argument("--port", type=int, default=8099, help="port to serve on (default 8099)")
+    parser.add_argument("--fail", type=int, default=0, help="answer the first N requests with --status")
+    parser.add_argument("--status", type=int, default=500, help="status for failed requests (default 500)")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = run_check()
+        print(f"\n{'FAIL: ' + ', '.join(failures) if failures else 'OK: all checks passed'}")
+        sys.exit(1 if failures else 0)
+
+    server = StandInServer(args.port, verbose=True)
+    server.fail_next(args.fail, args.status)
+    print(f"Webhook stand-in listening on http://127.0.0.1:{server.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
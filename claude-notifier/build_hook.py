@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Hook Handler Build
+==================
+Packages hooks/hook_handler.py as a self-contained zipapp with precompiled
+bytecode, and audits its cold-start import time.
+
+    python build_hook.py                 # build hooks/hook_handler.pyz
+    python build_hook.py audit           # build, then fail if imports exceed the budget
+    python build_hook.py audit --budget-ms 20 --runs 9
+
+Point the Claude Code hooks at the .pyz instead of the .py:
+    python "C:\\...\\claude-notifier\\hooks\\hook_handler.pyz"
+
+The archive is stored uncompressed (no zlib import or inflate at startup)
+and holds unchecked-hash .pyc files next to the sources. The bytecode
+matches the interpreter that ran the build; any other Python version
+falls back to the bundled source automatically.
+"""
+
+import os
+import sys
+import json
+import shutil
+import zipfile
+import argparse
+import tempfile
+import time
+import statistics
+import subprocess
+import py_compile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+HANDLER_SOURCE = ROOT / "hooks" / "hook_handler.py"
+OUTPUT = ROOT / "hooks" / "hook_handler.pyz"
+IMPORT_BUDGET_MS = 25.0  # Handler imports on top of a bare interpreter
+
+MAIN_SOURCE = """import hook_handler
+hook_handler.main()
+"""
+
+AUDIT_PAYLOAD = {
+    "session_id": "import-audit",
+    "hook_event_name": "PostToolUse",
+    "tool_name": "Bash",
+}
+
+
+def compile_source(source, filename):
+    """Compile source text to unchecked-hash .pyc bytes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src_path = os.path.join(tmp, filename)
+        pyc_path = src_path + "c"
+        with open(src_path, "w", encoding="utf-8") as f:
+            f.write(source)
+        py_compile.compile(src_path, cfile=pyc_path, dfile=filename, doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        with open(pyc_path, "rb") as f:
+            return f.read()
+
+
+def build(output=OUTPUT):
+    """Write the zipapp and return its path"""
+    handler_source = HANDLER_SOURCE.read_text(encoding="utf-8")
+    tmp_output = output.with_suffix(".pyz.tmp")
+    with open(tmp_output, "wb") as f:
+        f.write(b"#!/usr/bin/env python3\n")
+        with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_STORED) as zf:
+            # zipimport prefers the .pyc and uses the .py only if the magic number differs
+            zf.writestr("__main__.pyc", compile_source(MAIN_SOURCE, "__main__.py"))
+            zf.writestr("__main__.py", MAIN_SOURCE)
+            zf.writestr("hook_handler.pyc", compile_source(handler_source, "hook_handler.py"))
+            zf.writestr("hook_handler.py", handler_source)
+    os.replace(tmp_output, output)
+    print(f"Built {output} ({output.stat().st_size} bytes, bytecode for Python {sys.version_info[0]}.{sys.version_info[1]})")
+    return output
+
+
+def parse_importtime(stderr):
+    """Map module name -> self import time in microseconds from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        modules[fields[2].strip()] = int(fields[0])
+    return modules
+
+
+def run_importtime(args, stdin=b"", cwd=None, env=None):
+    """Run the interpreter under -X importtime, returns (modules, wall time in ms)"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], input=stdin,
+                            capture_output=True, cwd=cwd, env=env)
+    wall_ms = (time.perf_counter() - started) * 1000
+    return parse_importtime(result.stderr.decode(errors="replace")), wall_ms
+
+
+def audit(target, budget_ms, runs):
+    """Run the handler under -X importtime and compare its imports with the budget"""
+    payload = json.dumps(AUDIT_PAYLOAD).encode()
+    handler_totals = []
+    wall_times = []
+    per_module = {}
+    # Measure the handler without sending the audit event to a running tray
+    env = {**os.environ, "CLAUDE_NOTIFIER_NO_TRAY": "1"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Run a copy so the audit's log lines don't land in the real events.log
+        copy = Path(tmp) / target.name
+        shutil.copy(target, copy)
+
+        # The first run warms the OS file cache and is discarded
+        run_importtime([str(copy)], payload, cwd=tmp, env=env)
+        for _ in range(runs):
+            baseline, _ = run_importtime(["-c", "pass"], cwd=tmp, env=env)
+            modules, wall_ms = run_importtime([str(copy)], payload, cwd=tmp, env=env)
+            wall_times.append(wall_ms)
+            extra = {name: us for name, us in modules.items() if name not in baseline}
+            handler_totals.append(sum(extra.values()) / 1000)
+            for name, us in extra.items():
+                per_module.setdefault(name, []).append(us / 1000)
+
+    median_ms = statistics.median(handler_totals)
+    print(f"Import audit of {target.name} ({runs} runs)")
+    print(f"Handler imports: median {median_ms:.2f} ms, min {min(handler_totals):.2f} ms, "
+          f"max {max(handler_totals):.2f} ms (budget {budget_ms:.1f} ms)")
+    print(f"Whole run (informational): median {statistics.median(wall_times):.1f} ms")
+    top = sorted(per_module.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:10]
+    for name, times in top:
+        print(f"  {statistics.median(times):7.2f} ms  {name}")
+
+    if median_ms > budget_ms:
+        print("FAIL: cold-start imports are over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and audit the hook handler zipapp")
+    parser.add_argument("command", nargs="?", default="build", choices=["build", "audit"])
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help=f"import time budget in ms (default {IMPORT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=7, help="audit runs, the median is used (default 7)")
+    parser.add_argument("--source", action="store_true",
+                        help="audit hook_handler.py directly instead of the zipapp")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build()
+        return
+    target = HANDLER_SOURCE if args.source else build()
+    sys.exit(audit(target, args.budget_ms, args.runs))
+
+
+if __name__ == "__main__":
+    main()
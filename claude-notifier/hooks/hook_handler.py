@@ -3,32 +3,191 @@
 Claude Code Hook Handler with Sound and Tray Integration
 ========================================================
 Plays a sound when Claude is done and updates system tray status
+
+Every hook invocation is a fresh interpreter, so top-level imports are kept
+to what each run needs; subprocess is imported only on the paths that
+spawn PowerShell. build_hook.py packages this file as a zipapp.
+
+Status changes take a fast lane: the fields the tray needs are pulled
+from the raw stdin with a regex and sent before the config round trip,
+the full JSON parse and logging. Messages carry the hook start time so
+the tray can measure hook-start-to-icon latency.
 """
 
+import time
+HOOK_START = time.time()  # Stamped into tray messages for end-to-end latency
+
 import sys
+import os
+import re
 import json
-import subprocess
-from pathlib import Path
 import socket
-import time
+
+# Folder holding this handler (or the .pyz it was packaged into)
+HOOK_DIR = os.path.dirname(os.path.abspath(__file__))
+if os.path.isfile(HOOK_DIR):
+    HOOK_DIR = os.path.dirname(HOOK_DIR)
 
 # Configuration
 TRAY_PORT = 12345  # Port for communicating with tray app
 STATUS_WORKING = "working"
 STATUS_STANDBY = "standby"
 LOGGING_ENABLED = True  # Default, will be updated from tray app
+# Set (e.g. by build_hook.py audit) to run the handler without contacting the tray
+TRAY_DISABLED = bool(os.environ.get("CLAUDE_NOTIFIER_NO_TRAY"))
+
+# Direct socket delivery; the host that worked (or "bridge") is cached between runs
+ROUTE_FILE = os.path.join(HOOK_DIR, ".tray_route")
+ROUTE_RETRY = 60  # Seconds before a direct connection is tried again after falling back
+DIRECT_TIMEOUT = 0.15
+
+EVENT_STATUS = {
+    "UserPromptSubmit": STATUS_WORKING,
+    "PreToolUse": STATUS_WORKING,
+    "ToolUse": STATUS_WORKING,
+    "SubagentStart": STATUS_WORKING,
+    # Keep working status during PostToolUse (more tools might follow),
+    # the tray needs the event to stop its stuck tool timer
+    "PostToolUse": STATUS_WORKING,
+    "PostToolUseFailure": STATUS_WORKING,
+    "Stop": STATUS_STANDBY,
+    "SubagentStop": STATUS_STANDBY,
+    "Notification": STATUS_STANDBY,
+}
+
+# Sent only over a direct socket: a PowerShell spawn per tool call costs more
+# than the stuck tool watchdog is worth. The tray doesn't time tool calls that
+# arrive over the bridge, so a bridged PreToolUse needs no matching end event
+DIRECT_ONLY_EVENTS = {"PostToolUse", "PostToolUseFailure"}
+
+FAST_FIELDS = ("hook_event_name", "session_id", "tool_name", "tool_use_id", "transcript_path")
+FIELD_PATTERN = re.compile(r'"(%s)"\s*:\s*"((?:[^"\\]|\\.)*)"' % "|".join(FAST_FIELDS))
+
+def extract_fields(raw):
+    """Pull the tray message fields out of the raw hook JSON without parsing all of it.
+
+    Tool payloads can be megabytes; the first occurrence of each key wins,
+    keys inside string values never match because their quotes are escaped.
+    """
+    fields = {}
+    for match in FIELD_PATTERN.finditer(raw):
+        name, value = match.groups()
+        if name not in fields:
+            fields[name] = json.loads(f'"{value}"') if "\\" in value else value
+            if len(fields) == len(FAST_FIELDS):
+                break
+    return fields
+
+def windows_host_ip():
+    """Windows host IP as seen from WSL (read directly, spawning `cat` costs more than the lookup)"""
+    try:
+        with open('/etc/resolv.conf', 'r') as f:
+            for line in f:
+                if 'nameserver' in line:
+                    return line.split()[1]
+    except OSError:
+        pass
+    return "127.0.0.1"
+
+def read_route():
+    """Cached route: a host, "bridge" while the fallback is fresh, or None to probe"""
+    try:
+        with open(ROUTE_FILE, 'r') as f:
+            route = f.read().split()
+    except OSError:
+        return None
+    if not route:
+        return None
+    if route[0] == "bridge":
+        if len(route) > 1 and time.time() - float(route[1]) < ROUTE_RETRY:
+            return "bridge"
+        return None
+    return route[0]
 
-def send_status_to_tray(status):
+def write_route(route):
+    try:
+        with open(ROUTE_FILE, 'w') as f:
+            f.write(f"bridge {time.time()}" if route == "bridge" else route)
+    except OSError:
+        pass
+
+def send_direct(message):
+    """Send a message over a plain socket, returns False if the tray could not be reached"""
+    route = read_route()
+    if route == "bridge":
+        return False
+    # localhost works with mirrored WSL networking, the host IP with NAT
+    for host in [route] if route else ["127.0.0.1", windows_host_ip()]:
+        try:
+            # Not create_connection: its getaddrinfo call imports the idna codec
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.settimeout(DIRECT_TIMEOUT)
+                s.connect((host, TRAY_PORT))
+                s.sendall(message.encode())
+        except OSError:
+            continue
+        if host != route:
+            write_route(host)
+        return True
+    write_route("bridge")
+    return False
+
+def deliver_status(status, event_data):
+    """Fast lane: direct socket first, PowerShell bridge as fallback. Returns the transport used"""
+    if TRAY_DISABLED:
+        return "disabled"
+    # A cached host means the tool call most likely started over the direct socket
+    was_direct = read_route() not in (None, "bridge")
+    if send_direct(build_tray_message(status, event_data)):
+        return "direct"
+    if event_data.get("hook_event_name") in DIRECT_ONLY_EVENTS and not was_direct:
+        return "skipped"
+    send_status_to_tray(status, event_data)
+    return "bridge"
+
+def windows_path(path):
+    """Translate a WSL path so the Windows tray can open it"""
+    if not path.startswith("/"):
+        return path
+    parts = path.split("/")
+    # /mnt/c/Users/... -> C:\Users\...
+    if len(parts) > 2 and parts[1] == "mnt" and len(parts[2]) == 1:
+        return parts[2].upper() + ":\\" + "\\".join(parts[3:])
+    # Everything else lives in the distro's filesystem, reachable over the \\wsl.localhost share
+    distro = os.environ.get("WSL_DISTRO_NAME")
+    if not distro:
+        return path
+    return f"\\\\wsl.localhost\\{distro}" + path.replace("/", "\\")
+
+def build_tray_message(status, event_data, bridged=False):
+    """Build the JSON event message the tray uses for per-session tracking"""
+    message = {
+        "status": status,
+        "event": event_data.get("hook_event_name", ""),
+        "session_id": event_data.get("session_id", ""),
+        "tool": event_data.get("tool_name", ""),
+        "tool_use_id": event_data.get("tool_use_id", ""),
+        "transcript_path": windows_path(event_data.get("transcript_path", "")),
+        "hook_ts": HOOK_START,
+    }
+    if bridged:
+        # Tells the tray no end event will follow this one's tool call
+        message["bridged"] = True
+    return json.dumps(message)
+
+def send_status_to_tray(status, event_data=None):
     """Send status update to the system tray application"""
+    import subprocess
     try:
-        # Use PowerShell to bridge WSL to Windows connection
-        ps_script = Path(__file__).parent.parent / "powershell_bridge.ps1"
+        # Use PowerShell to bridge WSL to Windows connection.
+        # JSON messages go through stdin to avoid command line quoting issues.
+        ps_script = os.path.join(os.path.dirname(HOOK_DIR), "powershell_bridge.ps1")
+        message = build_tray_message(status, event_data, bridged=True) if event_data else status
         subprocess.run([
             "powershell.exe", "-ExecutionPolicy", "Bypass", "-File", 
-            str(ps_script).replace("/mnt/c", "C:").replace("/", "\\"),
-            "-Status", status
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        log_event({"action": "tray_update"}, f"Status sent via PowerShell: {status}", "INFO")
+            ps_script.replace("/mnt/c", "C:").replace("/", "\\"),
+            "-Stdin"
+        ], input=message.encode(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     except Exception as e:
         log_event({"action": "tray_update"}, f"Failed to send status: {e}", "ERROR")
         # Try to start tray if not running
@@ -41,6 +200,7 @@ def send_status_to_tray(status):
 
 def play_sound(sound_file):
     """Play a sound file using Windows Media Player via PowerShell"""
+    import subprocess
     try:
         log_event({"action": "play_sound"}, f"Attempting to play: {sound_file}", "DEBUG")
         # Use PowerShell to play sound
@@ -64,19 +224,14 @@ def play_sound(sound_file):
 def get_logging_config():
     """Get logging configuration from tray app"""
     global LOGGING_ENABLED
+    route = read_route()
+    if TRAY_DISABLED or route == "bridge":
+        # The tray isn't reachable over a socket, don't wait for the timeout
+        return
     try:
-        # Get Windows host IP for WSL
-        import subprocess
-        result = subprocess.run(['cat', '/etc/resolv.conf'], capture_output=True, text=True)
-        windows_ip = "127.0.0.1"  # fallback
-        for line in result.stdout.split('\n'):
-            if 'nameserver' in line:
-                windows_ip = line.split()[1]
-                break
-        
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             s.settimeout(0.5)
-            s.connect((windows_ip, TRAY_PORT))
+            s.connect((route or windows_host_ip(), TRAY_PORT))
             s.send(b"get_config")
             data = s.recv(1024).decode()
             config = json.loads(data)
@@ -90,7 +245,7 @@ def log_event(event_data, message="", level="INFO"):
     if not LOGGING_ENABLED:
         return
     try:
-        log_path = Path(__file__).parent / "events.log"
+        log_path = os.path.join(HOOK_DIR, "events.log")
         with open(log_path, "a", encoding="utf-8") as f:
             timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             event_name = event_data.get("hook_event_name", "Unknown") if isinstance(event_data, dict) else str(event_data)
@@ -109,40 +264,35 @@ def log_event(event_data, message="", level="INFO"):
 
 def main():
     try:
-        # Get logging config from tray app
+        # Stage 1, INSTANT YELLOW: deliver the status change before any config or logging work
+        raw = sys.stdin.read()
+        fields = extract_fields(raw)
+        input_data = None
+        if "hook_event_name" not in fields:
+            # Unusual layout, parse it properly
+            input_data = json.loads(raw)
+            fields = input_data
+        event_name = fields.get("hook_event_name", "")
+        status = EVENT_STATUS.get(event_name)
+        transport = deliver_status(status, fields) if status else None
+
+        # Stage 2: config and logging, the icon has already changed
         get_logging_config()
-        
-        # Read event data from Claude
-        input_data = json.load(sys.stdin)
+        if input_data is None:
+            input_data = json.loads(raw)
+            if status and any(fields.get(name) != input_data.get(name) for name in FAST_FIELDS if name in input_data):
+                # A nested object shadowed a top-level key; resend with the parsed values
+                log_event(input_data, "Fast lane fields differ from the parsed event, resending", "WARNING")
+                deliver_status(status, input_data)
         log_event(input_data)
         
-        event_name = input_data.get("hook_event_name", "")
         tool_name = input_data.get("tool_name", "")
         
         # Log all events for debugging
         log_event(input_data, f"Received event: {event_name}, Tool: {tool_name}", "INFO")
-        
-        # INSTANT YELLOW - NO DELAY, NO BULLSHIT
-        if event_name == "UserPromptSubmit":
-            # IMMEDIATELY turn yellow when user sends message
-            log_event(input_data, "INSTANT YELLOW on UserPromptSubmit!", "INFO")
-            send_status_to_tray(STATUS_WORKING)
-            # That's it. No checking, no waiting, just YELLOW NOW!
-        
-        # Update tray status based on OTHER events (not UserPromptSubmit - already handled above)
-        elif event_name in ["PreToolUse", "ToolUse", "SubagentStart"]:
-            # Claude is starting to work
-            log_event(input_data, f"Setting status to WORKING for event: {event_name}", "INFO")
-            send_status_to_tray(STATUS_WORKING)
-            
-        elif event_name in ["Stop", "SubagentStop", "Notification"]:
-            # Claude is done, waiting for input
-            log_event(input_data, f"Setting status to STANDBY for event: {event_name}", "INFO")
-            send_status_to_tray(STATUS_STANDBY)
-            
-        elif event_name == "PostToolUse":
-            # Keep working status during PostToolUse (more tools might follow)
-            log_event(input_data, f"Keeping WORKING status for event: {event_name}", "INFO")
+        if status:
+            elapsed_ms = (time.time() - HOOK_START) * 1000
+            log_event(input_data, f"Status {status.upper()} sent via {transport} after {elapsed_ms:.0f} ms", "INFO")
         
         # Always exit successfully
         sys.exit(0)
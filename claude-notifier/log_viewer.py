@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Claude Notifier Log Viewer
+==========================
+Shows the last N records of hooks/events.log without reading the whole
+file, optionally follows new appends, and filters while streaming.
+
+    python log_viewer.py                     # last 20 records
+    python log_viewer.py -n 100 --level WARNING
+    python log_viewer.py --follow --event PreToolUse --tool Bash
+
+The tail is found by reading fixed-size blocks backwards from the end of
+the file, and following only reads bytes appended since the last poll,
+so memory use does not depend on the size of the log.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from collections import deque
+from pathlib import Path
+
+LOG_FILE = Path(__file__).parent / "hooks" / "events.log"
+BLOCK_SIZE = 64 * 1024
+POLL_INTERVAL = 0.5
+MAX_CONTINUATION_LINES = 200  # Lines kept per record (DEBUG records can carry full payloads)
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+HEADER = re.compile(
+    r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \[(?P<level>\w+)\] Event: (?P<event>[^,\s]+)"
+    r"(?:, Tool: (?P<tool>[^\s]+))?"
+)
+
+
+class RecordFilter:
+    def __init__(self, level=None, event=None, tool=None):
+        self.min_level = LEVELS.get(level.upper(), 0) if level else 0
+        self.event = event.lower() if event else None
+        self.tool = tool.lower() if tool else None
+
+    def matches(self, header):
+        """Check a record's first line against the filters"""
+        match = HEADER.match(header)
+        if LEVELS.get(match.group("level"), 0) < self.min_level:
+            return False
+        if self.event and match.group("event").lower() != self.event:
+            return False
+        if self.tool and (match.group("tool") or "").lower() != self.tool:
+            return False
+        return True
+
+
+def reverse_lines(f, end):
+    """Yield the lines of f before byte offset `end`, last line first"""
+    position = end
+    partial = b""
+    while position > 0:
+        read_size = min(BLOCK_SIZE, position)
+        position -= read_size
+        f.seek(position)
+        block = f.read(read_size) + partial
+        lines = block.split(b"\n")
+        # The first piece may be cut mid-line; keep it for the next block
+        partial = lines.pop(0)
+        for line in reversed(lines):
+            yield line.decode("utf-8", errors="replace")
+    if partial:
+        yield partial.decode("utf-8", errors="replace")
+
+
+def tail_records(f, end, count, record_filter):
+    """Return the last `count` matching records before `end`, oldest first"""
+    records = deque()
+    if count <= 0:
+        # -n 0 with --follow shows only new records, like tail
+        return records
+    continuation = deque(maxlen=MAX_CONTINUATION_LINES)
+    skipped_trailing_newline = False
+    for line in reverse_lines(f, end):
+        if not skipped_trailing_newline:
+            skipped_trailing_newline = True
+            if line == "":
+                continue
+        if HEADER.match(line) is None:
+            # Continuation line (e.g. DEBUG "Full data" JSON), belongs to the header above it
+            continuation.appendleft(line)
+            continue
+        if record_filter.matches(line):
+            records.appendleft([line, *continuation])
+            if len(records) >= count:
+                break
+        continuation.clear()
+    return records
+
+
+def print_record(lines):
+    for line in lines:
+        print(line)
+    sys.stdout.flush()
+
+
+def follow(path, offset, record_filter):
+    """Print matching records appended after `offset` until interrupted"""
+    partial = b""
+    showing = False  # Whether continuation lines belong to a shown record
+    while True:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if size < offset:
+            # Log was truncated or replaced
+            print("--- log truncated, following from the start ---")
+            offset, partial = 0, b""
+        if size > offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                while offset < size:
+                    data = f.read(min(BLOCK_SIZE, size - offset))
+                    if not data:
+                        break
+                    offset += len(data)
+                    lines = (partial + data).split(b"\n")
+                    partial = lines.pop()
+                    for raw in lines:
+                        line = raw.decode("utf-8", errors="replace")
+                        if HEADER.match(line) is None:
+                            if showing:
+                                print(line)
+                            continue
+                        showing = record_filter.matches(line)
+                        if showing:
+                            print(line)
+            sys.stdout.flush()
+        time.sleep(POLL_INTERVAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail and filter the Claude notifier event log")
+    parser.add_argument("-n", "--lines", type=int, default=20, help="records to show (default 20)")
+    parser.add_argument("-f", "--follow", action="store_true", help="keep printing new records")
+    parser.add_argument("--level", choices=list(LEVELS), help="minimum level to show")
+    parser.add_argument("--event", help="only this hook event (e.g. PreToolUse)")
+    parser.add_argument("--tool", help="only this tool (e.g. Bash)")
+    parser.add_argument("--file", default=str(LOG_FILE), help=f"log file (default {LOG_FILE})")
+    args = parser.parse_args()
+
+    record_filter = RecordFilter(args.level, args.event, args.tool)
+    if not os.path.exists(args.file):
+        print(f"No log file found yet: {args.file}")
+        if not args.follow:
+            return
+        end = 0
+    else:
+        with open(args.file, "rb") as f:
+            end = os.fstat(f.fileno()).st_size
+            for record in tail_records(f, end, args.lines, record_filter):
+                print_record(record)
+
+    if args.follow:
+        try:
+            follow(args.file, end, record_filter)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
 # PowerShell bridge to send status to tray app
-param($Status)
+# -Stdin reads the message (e.g. a JSON event) from standard input instead
+param($Status, [switch]$Stdin)
+
+if ($Stdin) {
+    $Status = [Console]::In.ReadToEnd()
+}
 
 try {
     $client = New-Object System.Net.Sockets.TcpClient
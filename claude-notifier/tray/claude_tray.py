@@ -100,7 +100,10 @@ class ClaudeTrayApp:
         while self.running:
             try:
                 client_socket, addr = server_socket.accept()
-                data = client_socket.recv(1024).decode()
+                data = client_socket.recv(4096).decode()
+                if data.startswith("{"):
+                    # Structured event from the hook handler, only the status matters here
+                    data = json.loads(data).get("status") or ""
                 if data in ["working", "standby"]:
                     self.previous_status = self.status
                     self.status = data
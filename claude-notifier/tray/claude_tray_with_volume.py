@@ -5,94 +5,210 @@ Claude Status Tray Icon with Volume Control
 Shows Claude's working status in the system tray
 - Yellow (flashing) = Working
 - Green = Standby/Ready
+- Red (flashing) = A tool call looks stuck
+
+Besides plain "working"/"standby" messages the listener accepts JSON
+events from the hook handler ({"status", "event", "session_id", "tool"}),
+tracks per-session state, and streams changes to "subscribe" clients
+(see status_stream.py). The current state is mirrored into status.json.
+Events carrying a transcript_path feed per-session turn/tool/token
+counters (see transcript_tailer.py). Selected events are forwarded to
+the webhooks configured in config.json (see webhooks.py). The tray's own
+memory, threads and handles are sampled to spot leaks over long uptimes
+(see resource_monitor.py). Tool calls that run past their threshold
+without a PostToolUse turn the icon red and raise an alert (see watchdog.py).
+Hook events can also be exported as OTLP-JSON trace spans (see span_exporter.py).
+Status, sessions, counters and latency samples are snapshotted to
+tray_state.bin so a restarted tray resumes warm (see state_snapshot.py).
+Events stamped with the hook start time feed hook-to-icon latency
+histograms checked against an SLO (see hook_latency.py).
+
+Run with --headless to start only the status server (no tray icon, no
+sound). PIL, pystray and pygame are imported lazily, so headless mode
+works on machines without a display or audio device.
 """
 
+import time
+PROCESS_START = time.perf_counter()  # Reference point for the startup budget
+
 import sys
 import socket
 import threading
-import time
 import json
+import argparse
+import signal
 from pathlib import Path
-from PIL import Image, ImageDraw
-import pystray
-from pystray import MenuItem, Menu
-import winsound
-
-# Try to import pygame for volume control
-try:
-    import pygame
-    pygame.mixer.init()
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+from side_effects import SideEffectExecutor, DROP_NEWEST, DROP_OLDEST, BLOCK
+from status_stream import StatusStream
+from transcript_tailer import TranscriptTailer
+from webhooks import WebhookDispatcher
+from resource_monitor import ResourceMonitor
+from watchdog import ToolWatchdog, format_duration
+from span_exporter import SpanBuilder, SpanExporter
+from state_snapshot import save_snapshot, load_snapshot
+from hook_latency import HookLatency
+
+# GUI and audio modules, loaded on first use by load_gui_modules()/load_mixer()
+Image = ImageDraw = pystray = Menu = MenuItem = None
+pygame = None
+PYGAME_AVAILABLE = None  # Unknown until the first sound is played
 
+LISTEN_PORT = 12345
 ICON_SIZE = 64
 CURRENT_DIR = Path(__file__).parent
+STARTUP_BUDGET_MS = 150  # Module import to listener ready
+CONFIG_SAVE_DELAY = 0.5  # Seconds to wait so bursts of changes coalesce into one write
+STATUS_FILE = CURRENT_DIR / 'status.json'
+SESSION_TTL = 6 * 3600  # Forget sessions idle for longer than this
+TRANSCRIPT_STATE_FILE = CURRENT_DIR / 'transcripts.json'
+TRANSCRIPT_SAVE_DELAY = 5.0  # Seconds, offsets are persisted at most this often
+STATE_FILE = CURRENT_DIR / 'tray_state.bin'
+STATE_SAVE_DELAY = 10.0  # Seconds; the snapshot is rewritten at most this often while events arrive
+STATE_HORIZON = 600  # Seconds; an older "working" status or in-flight tool call is not restored
+LOG_VIEWER = CURRENT_DIR.parent / 'log_viewer.py'
+
+
+def load_gui_modules():
+    """Import PIL and pystray the first time the tray icon is needed"""
+    global Image, ImageDraw, pystray, Menu, MenuItem
+    if pystray is None:
+        from PIL import Image as _Image, ImageDraw as _ImageDraw
+        import pystray as _pystray
+        Image, ImageDraw = _Image, _ImageDraw
+        Menu, MenuItem = _pystray.Menu, _pystray.MenuItem
+        pystray = _pystray
+
+
+def load_mixer():
+    """Initialise pygame's mixer the first time a sound is played"""
+    global pygame, PYGAME_AVAILABLE
+    if PYGAME_AVAILABLE is None:
+        try:
+            import pygame as _pygame
+            _pygame.mixer.init()
+            pygame = _pygame
+            PYGAME_AVAILABLE = True
+        except Exception:
+            # Not installed, or no audio device available
+            PYGAME_AVAILABLE = False
+    return PYGAME_AVAILABLE
+
 
 class ClaudeTrayApp:
-    def __init__(self):
+    def __init__(self, headless=False, port=LISTEN_PORT):
         self.status = "standby"
         self.previous_status = "standby"
         self.icon = None
         self.running = True
+        self.headless = headless
+        self.port = port
         self.flash_state = False
         self.logging_enabled = True
         self.breathing_phase = 0  # For smooth breathing effect
         self.sound_file = r"C:\ChromeExtensions\Claude             hooks\claude-notifier\sounds\task_complete.wav"
         self.volume = 0.5  # 50% volume by default
-        
+        self.webhook_configs = []
+        self.tool_thresholds = {}
+        self.span_config = {}
+        self.latency_slo = {}
+
+        # Server metrics, reported by the get_metrics command
+        self.started_at = time.time()
+        self.startup_ms = None
+        self.listener_ready = threading.Event()
+        self.metrics = {
+            'messages': 0,
+            'status_changes': 0,
+            'config_requests': 0,
+            'errors': 0,
+        }
+
         # Load config
         self.load_config()
-        
-        # Create icon sets for breathing animation
+
+        # Sounds, toasts and config writes run here, off the listener and UI threads
+        self.effects = SideEffectExecutor(max_queue=32)
+        # Transcript parsing and allocation snapshots can take seconds; they get their
+        # own worker so a catch-up read never delays the completion sound or a toast
+        self.background = SideEffectExecutor(max_queue=32, name="background")
+
+        # Per-session state from structured hook events, streamed to subscribers
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.stream = StatusStream(self.snapshot, status_file=STATUS_FILE)
+        self.tailer = TranscriptTailer(TRANSCRIPT_STATE_FILE)
+        self.webhooks = WebhookDispatcher(self.webhook_configs)
+        self.resources = ResourceMonitor(gauges_fn=self.resource_gauges, on_warning=self.resource_warning)
+        self.watchdog = ToolWatchdog(self.tool_thresholds, on_stuck=self.tool_stuck, on_clear=self.tool_unstuck)
+        self.span_exporter = SpanExporter(self.span_config, base_dir=CURRENT_DIR)
+        self.spans = SpanBuilder(self.span_exporter.add)
+        self.hook_latency = HookLatency(self.latency_slo)
+
+        # Warm restart from the last snapshot
+        self.restored = None
+        self.restore_state()
+
+        # Icon sets for the breathing animation, built by load_icons()
         self.green_icons = []
         self.yellow_icons = []
-        
+        self.stuck_icons = []
+
+    def load_icons(self):
+        """Create the icon sets for the breathing animation"""
+        load_gui_modules()
+
         # Create gradient of green icons (breathing effect)
         for i in range(8):
             brightness = int(120 + (135 * (i / 7)))  # 120-255
             self.green_icons.append(self.create_icon_image((0, brightness, 0)))
-        
-        # Create gradient of yellow icons (breathing effect)  
+
+        # Create gradient of yellow icons (breathing effect)
         for i in range(8):
             brightness = int(180 + (75 * (i / 7)))  # 180-255
             self.yellow_icons.append(self.create_icon_image((brightness, brightness, 0)))
-        
+
+        # Create gradient of red-orange icons for stuck tool calls
+        for i in range(8):
+            brightness = int(180 + (75 * (i / 7)))  # 180-255
+            self.stuck_icons.append(self.create_icon_image((brightness, brightness // 4, 0)))
+
     def create_icon_image(self, color):
         """Create a colored circle icon"""
         image = Image.new('RGBA', (ICON_SIZE, ICON_SIZE), (0, 0, 0, 0))
         draw = ImageDraw.Draw(image)
-        
+
         # Draw circle with border
         draw.ellipse([4, 4, ICON_SIZE-4, ICON_SIZE-4], fill=color, outline=(64, 64, 64))
         draw.ellipse([8, 8, ICON_SIZE-8, ICON_SIZE-8], fill=color)
-        
+
         # Add highlight for 3D effect
         highlight_color = tuple(min(255, c + 50) for c in color)
         draw.ellipse([12, 12, 32, 32], fill=highlight_color)
-        
+
         return image
-    
+
     def update_icon(self):
         """Update icon based on current status with breathing effect"""
         if not self.icon:
             return
-            
+
         # Breathing animation cycle (0-14)
         breathing_cycle = int(time.time() * 2) % 15
-        
+
         if breathing_cycle < 8:
             # Inhale (getting brighter)
             frame = breathing_cycle
         else:
             # Exhale (getting dimmer)
             frame = 14 - breathing_cycle
-            
-        if self.status == "working":
+
+        if self.watchdog.stuck:
+            self.icon.icon = self.stuck_icons[frame]
+        elif self.status == "working":
             self.icon.icon = self.yellow_icons[frame]
         else:
             self.icon.icon = self.green_icons[frame]
-            
+
     def load_config(self):
         """Load configuration from file"""
         config_file = CURRENT_DIR / 'config.json'
@@ -102,9 +218,13 @@ class ClaudeTrayApp:
                     config = json.load(f)
                     self.logging_enabled = config.get('logging', True)
                     self.volume = config.get('volume', 0.5)
+                    self.webhook_configs = config.get('webhooks', [])
+                    self.tool_thresholds = config.get('tool_thresholds', {})
+                    self.span_config = config.get('spans', {})
+                    self.latency_slo = config.get('latency_slo_ms', {})
             except Exception as e:
                 print(f"Failed to load config: {e}")
-                
+
     def save_config(self):
         """Save configuration to file"""
         config_file = CURRENT_DIR / 'config.json'
@@ -112,51 +232,374 @@ class ClaudeTrayApp:
             'logging': self.logging_enabled,
             'volume': self.volume
         }
+        if self.webhook_configs:
+            config['webhooks'] = self.webhook_configs
+        if self.tool_thresholds:
+            config['tool_thresholds'] = self.tool_thresholds
+        if self.span_config:
+            config['spans'] = self.span_config
+        if self.latency_slo:
+            config['latency_slo_ms'] = self.latency_slo
         try:
             with open(config_file, 'w') as f:
                 json.dump(config, f, indent=2)
         except Exception as e:
             print(f"Failed to save config: {e}")
-    
+
     def listen_for_status(self):
         """Listen for status updates from the hook handler"""
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.bind(('127.0.0.1', 12345))
+        server_socket.bind(('127.0.0.1', self.port))
         server_socket.listen(5)
         server_socket.settimeout(1.0)  # 1 second timeout for checking self.running
-        
-        print("Tray app listening on port 12345...")
-        
+
+        self.startup_ms = (time.perf_counter() - PROCESS_START) * 1000
+        self.listener_ready.set()
+        print(f"Tray app listening on port {self.port} (ready in {self.startup_ms:.0f} ms)")
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            print(f"WARNING: startup took {self.startup_ms:.0f} ms, budget is {STARTUP_BUDGET_MS} ms")
+
         while self.running:
             try:
                 client_socket, addr = server_socket.accept()
-                data = client_socket.recv(1024).decode().strip()
-                
-                if data in ["working", "standby"]:
-                    self.previous_status = self.status
-                    self.status = data
-                    print(f"Status changed to: {self.status}")
-                    
-                    # Play sound when transitioning from working to standby
-                    if self.previous_status == "working" and self.status == "standby":
-                        self.play_notification_sound()
-                        
-                elif data == "get_config":
-                    # Send config back to hook handler
-                    config = {'logging_enabled': self.logging_enabled}
-                    client_socket.send(json.dumps(config).encode())
-                client_socket.close()
             except socket.timeout:
                 continue
+            keep_open = False
+            try:
+                # Don't let a silent client stall the listener
+                client_socket.settimeout(1.0)
+                data = client_socket.recv(4096).decode().strip()
+                keep_open = self.handle_message(data, client_socket)
             except Exception as e:
+                self.metrics['errors'] += 1
                 print(f"Listener error: {e}")
-                
+            finally:
+                if not keep_open:
+                    client_socket.close()
+
         server_socket.close()
-        
+
+    def handle_message(self, data, client_socket):
+        """Handle a single message, returns True if the socket must stay open"""
+        self.metrics['messages'] += 1
+
+        if data.startswith('{'):
+            # Structured event from the hook handler
+            self.handle_event(json.loads(data))
+
+        elif data in ["working", "standby"]:
+            self.set_status(data)
+            self.request_save_state()
+
+        elif data == "subscribe" or data.startswith("subscribe "):
+            # Hand the connection over to the stream, optionally with coalescing
+            parts = data.split()
+            coalesce_ms = int(parts[1]) if len(parts) > 1 else 0
+            self.stream.subscribe(client_socket, coalesce_ms)
+            return True
+
+        elif data == "get_config":
+            # Send config back to hook handler
+            self.metrics['config_requests'] += 1
+            config = {'logging_enabled': self.logging_enabled}
+            client_socket.send(json.dumps(config).encode())
+
+        elif data == "get_metrics":
+            client_socket.send(json.dumps(self.get_metrics()).encode())
+
+        elif data == "get_latency":
+            client_socket.send(json.dumps(self.hook_latency.stats()).encode())
+
+        elif data == "get_stats":
+            client_socket.send(json.dumps(self.tailer.all_stats()).encode())
+
+        elif data == "resources":
+            client_socket.sendall(json.dumps(self.resources.report()).encode())
+
+        elif data in ["resources snapshot", "resources diff"]:
+            # tracemalloc snapshots are slow, answer from the background worker
+            if self.background.submit('resources', self.send_resource_snapshot, client_socket,
+                                   data == "resources diff"):
+                return True
+            client_socket.send(json.dumps({'error': 'busy, try again'}).encode())
+
+        return False
+
+    def export_state(self):
+        """In-memory state worth keeping across restarts"""
+        with self.sessions_lock:
+            sessions = {sid: dict(session) for sid, session in self.sessions.items()}
+        return {
+            'status': self.status,
+            'sessions': sessions,
+            'metrics': dict(self.metrics),
+            'latency': self.effects.export_latency(),
+            'background_latency': self.background.export_latency(),
+            'tools': self.watchdog.export_calls(),
+            'hook_latency': self.hook_latency.export(),
+        }
+
+    def save_state(self):
+        """Write the state snapshot"""
+        try:
+            save_snapshot(STATE_FILE, self.export_state())
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Failed to save state snapshot: {e}")
+
+    def request_save_state(self):
+        """Snapshot soon, one pending write however many events arrive"""
+        self.effects.submit('save_state', self.save_state, key='state', delay=STATE_SAVE_DELAY)
+
+    def restore_state(self):
+        """Restore the last snapshot, dropping entries past their staleness horizon"""
+        started = time.perf_counter()
+        loaded = load_snapshot(STATE_FILE)
+        if loaded is None:
+            return
+        saved_at, state = loaded
+        now = time.time()
+        age = now - saved_at
+        if age > SESSION_TTL:
+            print(f"Ignoring state snapshot from {age / 3600:.1f} h ago")
+            return
+
+        self.sessions = {sid: session for sid, session in state.get('sessions', {}).items()
+                         if now - session.get('updated', 0) <= SESSION_TTL}
+        for name, value in state.get('metrics', {}).items():
+            if name in self.metrics:
+                self.metrics[name] = value
+        self.effects.restore_latency(state.get('latency', {}))
+        self.background.restore_latency(state.get('background_latency', {}))
+        self.hook_latency.restore(state.get('hook_latency', {}))
+        if age <= STATE_HORIZON:
+            # A "working" status or running tool from long ago most likely ended while the tray was down
+            self.status = self.previous_status = state.get('status', self.status)
+            for tool_use_id, call in state.get('tools', {}).items():
+                self.watchdog.tool_started(tool_use_id, call['session_id'], call['tool'], started=call['started'])
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.restored = {'age_s': round(age, 1), 'sessions': len(self.sessions), 'ms': round(elapsed_ms, 2)}
+        print(f"Restored state from {age:.0f}s ago in {elapsed_ms:.1f} ms: "
+              f"status {self.status}, {len(self.sessions)} sessions")
+
+    def set_status(self, status):
+        """Update the overall status and notify subscribers"""
+        self.previous_status = self.status
+        self.status = status
+        if self.status != self.previous_status:
+            self.metrics['status_changes'] += 1
+            self.stream.publish({'type': 'status', 'status': status, 'previous': self.previous_status})
+        print(f"Status changed to: {self.status}")
+
+        # Play sound when transitioning from working to standby
+        if self.previous_status == "working" and self.status == "standby":
+            self.request_sound()
+
+    def handle_event(self, event):
+        """Track a structured hook event: per-session state plus the overall status"""
+        status = event.get('status')
+        session_id = event.get('session_id')
+        if session_id:
+            now = time.time()
+            with self.sessions_lock:
+                session = self.sessions.setdefault(session_id, {'started': now})
+                if status:
+                    session['status'] = status
+                session['event'] = event.get('event')
+                session['tool'] = event.get('tool')
+                session['updated'] = now
+                update = {'type': 'session', 'session_id': session_id, **session}
+
+                # Drop sessions that have been idle for too long
+                for stale_id in [sid for sid, s in self.sessions.items() if now - s['updated'] > SESSION_TTL]:
+                    del self.sessions[stale_id]
+            self.stream.publish(update)
+
+            # Transcript parsing runs on the background worker, one pending update per session
+            transcript_path = event.get('transcript_path')
+            if transcript_path:
+                self.background.submit('transcript', self.update_transcript, session_id, transcript_path,
+                                    key=('transcript', session_id))
+
+        # In-flight tool calls for the stuck tool watchdog. The hook sends a tool's end
+        # only over the direct socket, so calls that started over the bridge aren't timed
+        tool_use_id = event.get('tool_use_id')
+        if event.get('event') == "PreToolUse" and tool_use_id and not event.get('bridged'):
+            self.watchdog.tool_started(tool_use_id, session_id, event.get('tool'))
+        elif event.get('event') in ["PostToolUse", "PostToolUseFailure"] and tool_use_id:
+            self.watchdog.tool_finished(tool_use_id)
+        elif event.get('event') == "Stop" and session_id:
+            self.watchdog.session_stopped(session_id)
+
+        if self.span_exporter.enabled:
+            self.spans.on_event(event)
+
+        if event.get('event'):
+            self.webhooks.dispatch({
+                'event': event['event'],
+                'status': status,
+                'session_id': session_id,
+                'tool': event.get('tool'),
+                'ts': time.time(),
+            })
+
+        if status in ["working", "standby"]:
+            self.set_status(status)
+            # Hook start to the status the icon shows
+            if isinstance(event.get('hook_ts'), (int, float)) and event.get('event'):
+                self.hook_latency.record(event['event'], event['hook_ts'])
+        self.request_save_state()
+
+    def update_transcript(self, session_id, transcript_path):
+        """Read new transcript lines and publish the session's updated counters"""
+        stats = self.tailer.update(session_id, transcript_path)
+        with self.sessions_lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return
+            session['stats'] = stats
+            update = {'type': 'session', 'session_id': session_id, **session}
+        self.stream.publish(update)
+        self.background.submit('save_transcripts', self.tailer.save, key='transcripts',
+                            delay=TRANSCRIPT_SAVE_DELAY)
+
+    def tool_stuck(self, tool_use_id, call):
+        """Watchdog callback: a tool call passed its threshold"""
+        limit = format_duration(self.watchdog.threshold(call['tool']))
+        message = f"{call['tool'] or 'Tool'} has been running for over {limit}"
+        print(f"Stuck tool: {message} ({tool_use_id})")
+        self.stream.publish({'type': 'stuck', 'session_id': call['session_id'], 'tool': call['tool'],
+                             'tool_use_id': tool_use_id, 'stuck': True})
+        self.webhooks.dispatch({
+            'event': 'ToolStuck',
+            'status': self.status,
+            'session_id': call['session_id'],
+            'tool': call['tool'],
+            'ts': time.time(),
+        })
+        self.notify(message, "Claude Notifier - tool stuck")
+
+    def tool_unstuck(self, tool_use_id, call):
+        """Watchdog callback: a stuck tool call finished"""
+        running = time.time() - call['started']
+        print(f"Stuck tool finished: {call['tool']} after {running:.0f}s ({tool_use_id})")
+        self.stream.publish({'type': 'stuck', 'session_id': call['session_id'], 'tool': call['tool'],
+                             'tool_use_id': tool_use_id, 'stuck': False})
+        self.notify(f"{call['tool'] or 'Tool'} finished after {format_duration(running)}")
+
+    def stuck_summary(self):
+        """Menu line for stuck tool calls"""
+        stuck = self.watchdog.stuck_calls()
+        if not stuck:
+            return "No stuck tools"
+        line = f"Stuck: {stuck[0]['tool']} {format_duration(stuck[0]['running_s'])}"
+        if len(stuck) > 1:
+            line += f" (+{len(stuck) - 1} more)"
+        return line
+
+    def session_summary(self):
+        """One line summary of the most recently active session, for the menu"""
+        with self.sessions_lock:
+            recent = [s for s in self.sessions.values() if 'stats' in s]
+            if not recent:
+                return "Session: no data"
+            stats = max(recent, key=lambda s: s['updated'])['stats']
+        tokens = stats['input_tokens'] + stats['output_tokens']
+        return f"Session: {stats['turns']} turns, {stats['tool_calls']} tools, {tokens:,} tokens"
+
+    def snapshot(self):
+        """Current status and sessions, for subscribers and the status file"""
+        with self.sessions_lock:
+            sessions = {sid: dict(session) for sid, session in self.sessions.items()}
+        return {'status': self.status, 'sessions': sessions, 'stuck': self.watchdog.stuck_calls()}
+
+    def get_metrics(self):
+        """Return server state and counters"""
+        return {
+            'status': self.status,
+            'headless': self.headless,
+            'uptime': round(time.time() - self.started_at, 1),
+            'startup_ms': round(self.startup_ms, 1) if self.startup_ms is not None else None,
+            'startup_budget_ms': STARTUP_BUDGET_MS,
+            **self.metrics,
+            'sessions': len(self.sessions),
+            'side_effects': self.effects.stats(),
+            'background': self.background.stats(),
+            'stream': self.stream.stats(),
+            'transcripts': self.tailer.counters,
+            'webhooks': self.webhooks.stats(),
+            'resources': self.resources.report(points=1),
+            'watchdog': self.watchdog.stats(),
+            'spans': self.span_exporter.counters,
+            'restored': self.restored,
+            'hook_latency': self.hook_latency.stats(),
+        }
+
+    def resource_gauges(self):
+        """App-level counts sampled along with the process resources"""
+        return {
+            'side_effect_depth': self.effects.depth(),
+            'background_depth': self.background.depth(),
+            'subscribers': len(self.stream.subscribers),
+            'sessions': len(self.sessions),
+            'webhook_depth': sum(d['depth'] for d in self.webhooks.stats()),
+            'tools_in_flight': len(self.watchdog.calls),
+        }
+
+    def resource_warning(self, message):
+        """Surface resource growth as a tray notification"""
+        self.notify(message, "Claude Notifier - resources")
+
+    def send_resource_snapshot(self, client_socket, diff):
+        """Reply to a 'resources snapshot' or 'resources diff' request and close the connection"""
+        try:
+            result = self.resources.snapshot()
+            if diff:
+                # Compare with the previous snapshot
+                result = self.resources.diff() or {
+                    'error': 'allocation tracing started, request the diff again later'}
+            client_socket.sendall(json.dumps(result).encode())
+        except OSError as e:
+            print(f"Failed to send resource snapshot: {e}")
+        finally:
+            client_socket.close()
+
+    def resource_report(self):
+        """Snapshot resources and show the change since the previous report"""
+        # Sample before tracing starts, so the RSS series doesn't include its overhead
+        current = self.resources.sample()
+        self.resources.snapshot()
+        diff = self.resources.diff()
+        summary = f"RSS {current[1]} MB, threads {current[2]}, handles {current[3]}"
+        if diff:
+            deltas = ", ".join(f"{field} {value:+g}" for field, value in diff['deltas'].items())
+            summary += f"\nSince last report ({diff['interval_s']:.0f}s): {deltas}"
+        else:
+            summary += "\nAllocation tracing started, report again to see what grew"
+        print(summary)
+        self.notify(summary, "Claude Notifier - resources")
+
+    def request_sound(self):
+        """Queue the notification sound, dropped if sounds are already backed up"""
+        if not self.headless:
+            self.effects.submit('sound', self.play_notification_sound, policy=DROP_NEWEST)
+
+    def request_save_config(self):
+        """Queue a config write, coalescing with any write still pending"""
+        self.effects.submit('save_config', self.save_config, key='config',
+                            delay=CONFIG_SAVE_DELAY, policy=BLOCK)
+
+    def notify(self, message, title="Claude Notifier"):
+        """Queue a tray notification, older toasts are dropped first"""
+        if self.icon:
+            self.effects.submit('notify', self.icon.notify, message, title, policy=DROP_OLDEST)
+
     def play_notification_sound(self):
         """Play notification sound with volume control"""
+        if self.headless:
+            return
         try:
-            if PYGAME_AVAILABLE:
+            if load_mixer():
                 # Use pygame for volume control
                 sound = pygame.mixer.Sound(self.sound_file)
                 sound.set_volume(self.volume)
@@ -164,76 +607,154 @@ class ClaudeTrayApp:
                 print(f"Task complete sound played at {int(self.volume * 100)}% volume")
             else:
                 # Fall back to winsound (no volume control)
+                import winsound
                 winsound.PlaySound(self.sound_file, winsound.SND_FILENAME | winsound.SND_ASYNC)
                 print("Task complete sound played (install pygame for volume control)")
         except Exception as e:
             print(f"Failed to play sound: {e}")
-    
+
     def animation_thread(self):
         """Update the icon animation"""
         while self.running:
             self.update_icon()
             time.sleep(0.1)  # Update every 100ms for smooth animation
-            
+
     def toggle_logging(self, icon, item):
         """Toggle logging on/off"""
         self.logging_enabled = not self.logging_enabled
-        print(f"Logging {'enabled' if self.logging_enabled else 'disabled'}")
-        self.save_config()
-        
+        status = 'enabled' if self.logging_enabled else 'disabled'
+        print(f"Logging {status}")
+        self.request_save_config()
+        self.notify(f"Logging {status}")
+
     def set_volume(self, level):
         """Set volume level"""
         def handler(icon, item):
             self.volume = level
             print(f"Volume set to {int(level * 100)}%")
-            self.save_config()
+            self.request_save_config()
             # Test the new volume
-            self.play_notification_sound()
+            self.request_sound()
         return handler
-        
+
+    def open_log_viewer(self, icon, item):
+        """Open the log viewer following events.log in a new console window"""
+        import subprocess
+        # pythonw has no console, the viewer needs python.exe
+        python = sys.executable.replace('pythonw', 'python')
+        try:
+            subprocess.Popen([python, str(LOG_VIEWER), '--follow', '-n', '50'],
+                             creationflags=getattr(subprocess, 'CREATE_NEW_CONSOLE', 0))
+        except Exception as e:
+            print(f"Failed to open log viewer: {e}")
+
+    def show_resource_report(self, icon, item):
+        """Menu handler, the tracemalloc snapshot runs on the background worker"""
+        self.background.submit('resource_report', self.resource_report, key='resource_report')
+
     def exit_app(self, icon, item):
         """Exit the application"""
         self.running = False
+        # Flush any pending config write before the process exits
+        self.background.stop(drain=True)
+        self.effects.stop(drain=True)
+        self.stream.stop()
+        self.webhooks.stop()
+        self.resources.stop()
+        self.watchdog.stop()
+        self.span_exporter.stop()
+        self.tailer.save()
+        self.save_state()
         icon.stop()
-        
+
+    def stop(self, *args):
+        """Stop the status server (headless mode)"""
+        self.running = False
+
+    def run_headless(self):
+        """Run only the status server, without tray icon or sound"""
+        self.effects.start()
+        self.background.start()
+        self.stream.start()
+        self.webhooks.start()
+        self.resources.start()
+        self.watchdog.start()
+        self.span_exporter.start()
+        listener_thread = threading.Thread(target=self.listen_for_status, daemon=True)
+        listener_thread.start()
+
+        try:
+            while self.running and listener_thread.is_alive():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            self.running = False
+        listener_thread.join(timeout=2)
+        self.background.stop(drain=True)
+        self.effects.stop(drain=True)
+        self.stream.stop()
+        self.webhooks.stop()
+        self.resources.stop()
+        self.watchdog.stop()
+        self.span_exporter.stop()
+        self.tailer.save()
+        self.save_state()
+
     def run(self):
         """Run the tray application"""
+        if self.headless:
+            self.run_headless()
+            return
+
+        self.load_icons()
+        self.effects.start()
+        self.background.start()
+        self.stream.start()
+        self.webhooks.start()
+        self.resources.start()
+        self.watchdog.start()
+        self.span_exporter.start()
+
         # Create menu
         menu = Menu(
             MenuItem('Status: ' + self.status, None, enabled=False),
+            MenuItem(lambda item: self.session_summary(), None, enabled=False),
+            MenuItem(lambda item: self.stuck_summary(), None, enabled=False,
+                    visible=lambda item: bool(self.watchdog.stuck)),
             MenuItem('---', None, enabled=False),
             MenuItem('Volume', Menu(
-                MenuItem('100%', self.set_volume(1.0), 
-                        checked=lambda item: self.volume == 1.0, 
+                MenuItem('100%', self.set_volume(1.0),
+                        checked=lambda item: self.volume == 1.0,
                         radio=True),
-                MenuItem('75%', self.set_volume(0.75), 
-                        checked=lambda item: self.volume == 0.75, 
+                MenuItem('75%', self.set_volume(0.75),
+                        checked=lambda item: self.volume == 0.75,
                         radio=True),
-                MenuItem('50%', self.set_volume(0.5), 
-                        checked=lambda item: self.volume == 0.5, 
+                MenuItem('50%', self.set_volume(0.5),
+                        checked=lambda item: self.volume == 0.5,
                         radio=True),
-                MenuItem('25%', self.set_volume(0.25), 
-                        checked=lambda item: self.volume == 0.25, 
+                MenuItem('25%', self.set_volume(0.25),
+                        checked=lambda item: self.volume == 0.25,
                         radio=True),
-                MenuItem('10%', self.set_volume(0.1), 
-                        checked=lambda item: self.volume == 0.1, 
+                MenuItem('10%', self.set_volume(0.1),
+                        checked=lambda item: self.volume == 0.1,
                         radio=True),
             )),
-            MenuItem('Test Sound', lambda icon, item: self.play_notification_sound()),
+            MenuItem('Test Sound', lambda icon, item: self.request_sound()),
             MenuItem('---', None, enabled=False),
             MenuItem('Toggle Logging', self.toggle_logging,
                     checked=lambda item: self.logging_enabled),
+            MenuItem('View Logs', self.open_log_viewer),
+            MenuItem('Resource Report', self.show_resource_report),
             MenuItem('Exit', self.exit_app)
         )
-        
+
         # Start listener thread
         listener_thread = threading.Thread(target=self.listen_for_status, daemon=True)
         listener_thread.start()
-        
+
         # Start animation thread
         anim_thread = threading.Thread(target=self.animation_thread, daemon=True)
         anim_thread.start()
-        
+
         # Create and run icon
         self.icon = pystray.Icon(
             "claude_status",
@@ -241,39 +762,79 @@ class ClaudeTrayApp:
             "Claude Status",
             menu
         )
-        
+
         # Update menu dynamically
         def update_menu(icon):
             icon.menu = Menu(
                 MenuItem(f'Status: {self.status}', None, enabled=False),
+                MenuItem(lambda item: self.session_summary(), None, enabled=False),
+                MenuItem(lambda item: self.stuck_summary(), None, enabled=False,
+                        visible=lambda item: bool(self.watchdog.stuck)),
                 MenuItem('---', None, enabled=False),
                 MenuItem('Volume', Menu(
-                    MenuItem('100%', self.set_volume(1.0), 
-                            checked=lambda item: self.volume == 1.0, 
+                    MenuItem('100%', self.set_volume(1.0),
+                            checked=lambda item: self.volume == 1.0,
                             radio=True),
-                    MenuItem('75%', self.set_volume(0.75), 
-                            checked=lambda item: self.volume == 0.75, 
+                    MenuItem('75%', self.set_volume(0.75),
+                            checked=lambda item: self.volume == 0.75,
                             radio=True),
-                    MenuItem('50%', self.set_volume(0.5), 
-                            checked=lambda item: self.volume == 0.5, 
+                    MenuItem('50%', self.set_volume(0.5),
+                            checked=lambda item: self.volume == 0.5,
                             radio=True),
-                    MenuItem('25%', self.set_volume(0.25), 
-                            checked=lambda item: self.volume == 0.25, 
+                    MenuItem('25%', self.set_volume(0.25),
+                            checked=lambda item: self.volume == 0.25,
                             radio=True),
-                    MenuItem('10%', self.set_volume(0.1), 
-                            checked=lambda item: self.volume == 0.1, 
+                    MenuItem('10%', self.set_volume(0.1),
+                            checked=lambda item: self.volume == 0.1,
                             radio=True),
                 )),
-                MenuItem('Test Sound', lambda icon, item: self.play_notification_sound()),
+                MenuItem('Test Sound', lambda icon, item: self.request_sound()),
                 MenuItem('---', None, enabled=False),
                 MenuItem('Toggle Logging', self.toggle_logging,
                         checked=lambda item: self.logging_enabled),
+                MenuItem('View Logs', self.open_log_viewer),
+                MenuItem('Resource Report', self.show_resource_report),
                 MenuItem('Exit', self.exit_app)
             )
-            
+
         self.icon.update_menu = update_menu
         self.icon.run()
 
+
+def check_startup(port=LISTEN_PORT):
+    """Start the headless server, report startup time and exit"""
+    app = ClaudeTrayApp(headless=True, port=port)
+    listener_thread = threading.Thread(target=app.listen_for_status, daemon=True)
+    listener_thread.start()
+    if not app.listener_ready.wait(timeout=5):
+        print("Listener did not start")
+        return 1
+    app.running = False
+    within_budget = app.startup_ms <= STARTUP_BUDGET_MS
+    print(f"Startup: {app.startup_ms:.1f} ms (budget {STARTUP_BUDGET_MS} ms) - "
+          f"{'OK' if within_budget else 'OVER BUDGET'}")
+    print(f"GUI modules loaded: {'PIL' in sys.modules or 'pystray' in sys.modules}")
+    return 0 if within_budget else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Claude status tray with volume control")
+    parser.add_argument("--headless", action="store_true",
+                        help="run only the status server (no tray icon, no sound)")
+    parser.add_argument("--port", type=int, default=LISTEN_PORT,
+                        help=f"port to listen on (default {LISTEN_PORT})")
+    parser.add_argument("--check-startup", action="store_true",
+                        help="measure headless startup time against the budget and exit")
+    args = parser.parse_args()
+
+    if args.check_startup:
+        sys.exit(check_startup(args.port))
+
+    app = ClaudeTrayApp(headless=args.headless, port=args.port)
+    if args.headless:
+        signal.signal(signal.SIGTERM, app.stop)
+    app.run()
+
+
 if __name__ == "__main__":
-    app = ClaudeTrayApp()
-    app.run()
\ No newline at end of file
+    main()
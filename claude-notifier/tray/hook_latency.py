@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Hook Latency Tracking
+=====================
+Measures how long a hook event takes from the hook process starting to
+the tray applying the status (the icon animation picks it up on its next
+frame), per event name, against a latency SLO.
+
+The hook stamps its start time (time.time() in WSL) into each message;
+the tray compares it with its own clock. WSL and Windows clocks can
+drift apart, so negative or implausibly large latencies are counted as
+clock skew instead of being recorded.
+
+SLOs are milliseconds per event name, configured in config.json:
+
+    "latency_slo_ms": {"default": 1000, "UserPromptSubmit": 300}
+
+Histograms use fixed buckets so they stay small and can be stored in the
+tray state snapshot.
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from collections import deque
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MAX_SKEW_MS = 60000  # Latencies above this are treated as clock skew
+RECENT_VIOLATIONS = 20
+
+DEFAULT_SLO_MS = {
+    'default': 1000,
+    'UserPromptSubmit': 300,  # The user is looking at the icon right after pressing enter
+}
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last bucket counts everything above the top bound
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms):
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the percentile, never above the largest latency seen"""
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return float(min(self.buckets[index], self.max_ms)) if index < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {'counts': self.counts, 'total_ms': self.total_ms, 'max_ms': self.max_ms}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        if len(data.get('counts', [])) == len(histogram.counts):
+            histogram.counts = list(data['counts'])
+            histogram.count = sum(histogram.counts)
+            histogram.total_ms = data.get('total_ms', 0.0)
+            histogram.max_ms = data.get('max_ms', 0.0)
+        return histogram
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 1) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 1),
+            'p95_ms': round(self.percentile(95), 1),
+            'p99_ms': round(self.percentile(99), 1),
+            'max_ms': round(self.max_ms, 1),
+        }
+
+
+class HookLatency:
+    def __init__(self, slo_ms=None):
+        self.slo_ms = {**DEFAULT_SLO_MS, **(slo_ms or {})}
+        self.histograms = {}  # event name -> LatencyHistogram
+        self.violations = {}  # event name -> count
+        self.recent = deque(maxlen=RECENT_VIOLATIONS)
+        self.skewed = 0
+        self.lock = threading.Lock()
+
+    def slo(self, event):
+        return self.slo_ms.get(event, self.slo_ms['default'])
+
+    def record(self, event, hook_ts, now=None):
+        """Record one event's hook-start-to-status latency, returns it in ms (None if skewed)"""
+        latency_ms = ((now or time.time()) - hook_ts) * 1000
+        with self.lock:
+            if latency_ms < 0 or latency_ms > MAX_SKEW_MS:
+                self.skewed += 1
+                return None
+            self.histograms.setdefault(event, LatencyHistogram()).record(latency_ms)
+            violated = latency_ms > self.slo(event)
+            if violated:
+                self.violations[event] = self.violations.get(event, 0) + 1
+                self.recent.append({'ts': round(time.time(), 1), 'event': event, 'latency_ms': round(latency_ms, 1)})
+        if violated:
+            print(f"SLO violation: {event} took {latency_ms:.0f} ms (SLO {self.slo(event)} ms)")
+        return latency_ms
+
+    def export(self):
+        """Histograms and violation counts, for state snapshots"""
+        with self.lock:
+            return {
+                'histograms': {event: histogram.to_dict() for event, histogram in self.histograms.items()},
+                'violations': dict(self.violations),
+                'skewed': self.skewed,
+            }
+
+    def restore(self, data):
+        with self.lock:
+            for event, histogram in data.get('histograms', {}).items():
+                self.histograms[event] = LatencyHistogram.from_dict(histogram)
+            self.violations.update(data.get('violations', {}))
+            self.skewed = data.get('skewed', 0)
+
+    def stats(self):
+        """Per event latency percentiles, SLO and violations"""
+        with self.lock:
+            events = {}
+            for event, histogram in self.histograms.items():
+                stats = histogram.stats()
+                violations = self.violations.get(event, 0)
+                events[event] = {
+                    **stats,
+                    'slo_ms': self.slo(event),
+                    'violations': violations,
+                    'within_slo': round(1 - violations / stats['count'], 4) if stats['count'] else 1.0,
+                }
+            return {'events': events, 'skewed': self.skewed, 'recent_violations': list(self.recent)}
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Resource Monitor
+================
+Samples the tray's own resource usage so growth over days of uptime is
+visible: resident memory, thread count, open handles / file descriptors
+and sockets, plus any gauges the app adds (queue depths, subscribers).
+
+- Samples are kept as a compact time series (tuples in a bounded deque)
+- After a warm-up period the first sample becomes the baseline; growth
+  past the thresholds raises one warning per metric until it recovers
+- snapshot() takes a tracemalloc snapshot on demand and diff() compares
+  the last two: top allocators plus the resource deltas between them.
+  Tracing starts with the first snapshot and stops after the diff, so
+  its overhead never lingers in a long-running tray (or in the RSS
+  series the warnings are based on)
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+
+SAMPLE_INTERVAL = 60.0  # Seconds between samples
+MAX_SAMPLES = 1440  # One day at the default interval
+WARMUP = 300.0  # Seconds before the baseline is taken
+TOP_ALLOCATORS = 10
+
+# Growth over the baseline that triggers a warning
+THRESHOLDS = {
+    'rss_mb': 50.0,
+    'threads': 10,
+    'handles': 200,
+    'sockets': 50,
+}
+
+FIELDS = ('ts', 'rss_mb', 'threads', 'handles', 'sockets')
+
+
+def _linux_rss_mb():
+    with open('/proc/self/statm', 'r') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def _linux_fds():
+    """(open fds, of which sockets)"""
+    fds = sockets = 0
+    for name in os.listdir('/proc/self/fd'):
+        fds += 1
+        try:
+            if os.readlink(f'/proc/self/fd/{name}').startswith('socket:'):
+                sockets += 1
+        except OSError:
+            pass
+    return fds, sockets
+
+
+def _windows_counters():
+    """(working set MB, handle count) via psapi/kernel32"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    kernel32 = ctypes.windll.kernel32
+    psapi = ctypes.windll.psapi
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    kernel32.GetProcessHandleCount.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD)]
+    psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+
+    process = kernel32.GetCurrentProcess()
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    rss_mb = None
+    if psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        rss_mb = counters.WorkingSetSize / (1024 * 1024)
+    handles = wintypes.DWORD()
+    handle_count = handles.value if kernel32.GetProcessHandleCount(process, ctypes.byref(handles)) else None
+    return rss_mb, handle_count
+
+
+def sample_process():
+    """One resource sample as a tuple in FIELDS order (None where unavailable)"""
+    rss_mb = handles = sockets = None
+    try:
+        if sys.platform.startswith('linux'):
+            rss_mb = _linux_rss_mb()
+            handles, sockets = _linux_fds()
+        elif sys.platform == 'win32':
+            rss_mb, handles = _windows_counters()
+    except (OSError, AttributeError, ValueError):
+        pass
+    if rss_mb is not None:
+        rss_mb = round(rss_mb, 1)
+    return (time.time(), rss_mb, threading.active_count(), handles, sockets)
+
+
+class ResourceMonitor:
+    def __init__(self, gauges_fn=None, on_warning=None, interval=SAMPLE_INTERVAL,
+                 warmup=WARMUP, thresholds=None):
+        self.gauges_fn = gauges_fn
+        self.on_warning = on_warning
+        self.interval = interval
+        self.warmup = warmup
+        self.thresholds = thresholds or THRESHOLDS
+        self.samples = deque(maxlen=MAX_SAMPLES)
+        self.gauges = {}
+        self.baseline = None
+        self.warned = set()
+        self.snapshots = deque(maxlen=2)
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        self._stop.clear()
+        threading.Thread(target=self._run, name="resource-monitor", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self.stop_tracing()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        """Take a sample, update the baseline and check thresholds"""
+        current = sample_process()
+        gauges = {}
+        if self.gauges_fn:
+            try:
+                gauges = self.gauges_fn()
+            except Exception as e:
+                print(f"Resource gauges failed: {e}")
+        with self.lock:
+            self.samples.append(current)
+            self.gauges = gauges
+            if self.baseline is None and current[0] - self.started >= self.warmup:
+                self.baseline = current
+        self._check(current)
+        return current
+
+    def _check(self, current):
+        if self.baseline is None:
+            return
+        for index, field in enumerate(FIELDS):
+            limit = self.thresholds.get(field)
+            if limit is None or current[index] is None or self.baseline[index] is None:
+                continue
+            growth = current[index] - self.baseline[index]
+            if growth > limit and field not in self.warned:
+                self.warned.add(field)
+                message = (f"{field} grew by {growth:g} since startup baseline "
+                           f"({self.baseline[index]:g} -> {current[index]:g})")
+                print(f"WARNING: {message}")
+                if self.on_warning:
+                    self.on_warning(message)
+            elif growth <= limit / 2:
+                # Re-arm once the metric has clearly recovered
+                self.warned.discard(field)
+
+    def report(self, points=60):
+        """Latest sample, baseline and the most recent part of the time series"""
+        with self.lock:
+            series = list(self.samples)[-points:]
+            return {
+                'fields': FIELDS,
+                'current': series[-1] if series else None,
+                'baseline': self.baseline,
+                'gauges': self.gauges,
+                'warnings': sorted(self.warned),
+                'samples': len(self.samples),
+                'series': series,
+            }
+
+    def snapshot(self):
+        """Take a tracemalloc snapshot (starting tracing if needed), returns top allocators"""
+        # Imported here, tracemalloc pulls in pickle and is only needed on demand
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        snap = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        current = sample_process()
+        with self.lock:
+            self.snapshots.append((current, snap))
+        top = snap.statistics('lineno')[:TOP_ALLOCATORS]
+        traced = tracemalloc.get_traced_memory()[0]
+        return {
+            'ts': current[0],
+            'traced_mb': round(traced / (1024 * 1024), 2),
+            'top_allocators': [
+                {'where': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                for stat in top
+            ],
+        }
+
+    def stop_tracing(self):
+        """Stop tracemalloc and forget the snapshots, they can't be compared across a restart"""
+        import tracemalloc
+        with self.lock:
+            self.snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def diff(self):
+        """Compare the last two snapshots and stop tracing; None until two have been taken"""
+        with self.lock:
+            if len(self.snapshots) < 2:
+                return None
+            (old_sample, old_snap), (new_sample, new_snap) = self.snapshots
+        self.stop_tracing()
+        deltas = {}
+        for index, field in enumerate(FIELDS[1:], start=1):
+            if old_sample[index] is not None and new_sample[index] is not None:
+                deltas[field] = round(new_sample[index] - old_sample[index], 1)
+        top = new_snap.compare_to(old_snap, 'lineno')[:TOP_ALLOCATORS]
+        return {
+            'interval_s': round(new_sample[0] - old_sample[0], 1),
+            'deltas': deltas,
+            'top_growth': [
+                {'where': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'size_diff_kb': round(stat.size_diff / 1024, 1), 'count_diff': stat.count_diff}
+                for stat in top
+            ],
+        }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Side Effect Executor
+====================
+Bounded worker queue for the tray's slow side effects (sounds, toasts,
+config writes), so the socket listener and the pystray thread only record
+state and hand the work off.
+
+- Bounded: when the queue is full a task is dropped according to its policy
+  ("drop_newest", "drop_oldest" or "block" with a timeout)
+- Coalescing: tasks submitted with the same key replace the pending one,
+  so a burst of config changes ends up as a single write
+- Metrics: queue depth, drops and queue-wait / run latency per task name
+"""
+
+import threading
+import time
+from collections import deque
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+LATENCY_SAMPLES = 256  # Recent samples kept per task name
+
+
+class _Task:
+    __slots__ = ("name", "func", "args", "key", "enqueued", "not_before")
+
+    def __init__(self, name, func, args, key, delay):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.key = key
+        self.enqueued = time.perf_counter()
+        self.not_before = self.enqueued + delay
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class SideEffectExecutor:
+    def __init__(self, max_queue=32, workers=1, policy=DROP_NEWEST, block_timeout=0.5, name="side-effects"):
+        self.name = name
+        self.max_queue = max_queue
+        self.workers = workers
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._pending = deque()
+        self._by_key = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = False
+        self._draining = False
+
+        self.counters = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'dropped': 0,
+            'coalesced': 0,
+        }
+        self.max_depth = 0
+        self._wait_ms = {}
+        self._run_ms = {}
+
+    def start(self):
+        """Start the worker threads"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._draining = False
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, drain=True, timeout=2.0):
+        """Stop the workers, running pending tasks first when drain is set"""
+        with self._cond:
+            if not drain:
+                self.counters['dropped'] += len(self._pending)
+                self._pending.clear()
+                self._by_key.clear()
+            self._draining = True
+            self._running = False
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        self._threads = []
+
+    def submit(self, name, func, *args, key=None, delay=0.0, policy=None):
+        """Queue func(*args), returns False if the task was dropped"""
+        policy = policy or self.policy
+        with self._cond:
+            self.counters['submitted'] += 1
+
+            # Replace a pending task with the same key instead of queueing another
+            if key is not None and key in self._by_key:
+                task = self._by_key[key]
+                task.func = func
+                task.args = args
+                self.counters['coalesced'] += 1
+                return True
+
+            if len(self._pending) >= self.max_queue:
+                if policy == DROP_OLDEST:
+                    evicted = self._pending.popleft()
+                    if evicted.key is not None:
+                        self._by_key.pop(evicted.key, None)
+                    self.counters['dropped'] += 1
+                elif policy == BLOCK:
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._pending) >= self.max_queue:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.counters['dropped'] += 1
+                            return False
+                        self._cond.wait(remaining)
+                else:
+                    self.counters['dropped'] += 1
+                    return False
+
+            task = _Task(name, func, args, key, delay)
+            self._pending.append(task)
+            if key is not None:
+                self._by_key[key] = task
+            self.max_depth = max(self.max_depth, len(self._pending))
+            self._cond.notify_all()
+            return True
+
+    def _next_task(self):
+        """Pop the first task that is due, waiting as needed (None to exit)"""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    if not self._running:
+                        return None
+                    self._cond.wait()
+                    continue
+
+                now = time.perf_counter()
+                due = None
+                for task in self._pending:
+                    # Delays are ignored while draining on shutdown
+                    if self._draining or task.not_before <= now:
+                        due = task
+                        break
+                if due is not None:
+                    self._pending.remove(due)
+                    if due.key is not None:
+                        self._by_key.pop(due.key, None)
+                    # Wake producers blocked on a full queue
+                    self._cond.notify_all()
+                    return due
+
+                next_due = min(task.not_before for task in self._pending)
+                self._cond.wait(max(0.001, next_due - now))
+
+    def _worker(self):
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            started = time.perf_counter()
+            try:
+                task.func(*task.args)
+                outcome = 'completed'
+            except Exception as e:
+                outcome = 'failed'
+                print(f"Side effect {task.name} failed: {e}")
+            finished = time.perf_counter()
+            # Queue wait is measured from when the task became due
+            wait_ms = max(0.0, started - max(task.enqueued, task.not_before)) * 1000
+            with self._cond:
+                self.counters[outcome] += 1
+                self._wait_ms.setdefault(task.name, deque(maxlen=LATENCY_SAMPLES)).append(wait_ms)
+                self._run_ms.setdefault(task.name, deque(maxlen=LATENCY_SAMPLES)).append((finished - started) * 1000)
+
+    def depth(self):
+        """Number of tasks waiting to run"""
+        with self._cond:
+            return len(self._pending)
+
+    def export_latency(self):
+        """Raw latency samples per task name, for state snapshots"""
+        with self._cond:
+            return {name: [list(self._wait_ms[name]), list(self._run_ms[name])] for name in self._run_ms}
+
+    def restore_latency(self, samples):
+        """Seed the latency samples from a snapshot"""
+        with self._cond:
+            for name, (waits, runs) in samples.items():
+                self._wait_ms.setdefault(name, deque(maxlen=LATENCY_SAMPLES)).extend(waits)
+                self._run_ms.setdefault(name, deque(maxlen=LATENCY_SAMPLES)).extend(runs)
+
+    def stats(self):
+        """Queue depth, counters and latency percentiles per task name"""
+        with self._cond:
+            latency = {}
+            for name in self._run_ms:
+                waits = sorted(self._wait_ms[name])
+                runs = sorted(self._run_ms[name])
+                latency[name] = {
+                    'count': len(runs),
+                    'wait_p50_ms': round(_percentile(waits, 50), 2),
+                    'wait_p95_ms': round(_percentile(waits, 95), 2),
+                    'run_p50_ms': round(_percentile(runs, 50), 2),
+                    'run_p95_ms': round(_percentile(runs, 95), 2),
+                    'run_max_ms': round(runs[-1], 2),
+                }
+            return {
+                'depth': len(self._pending),
+                'max_depth': self.max_depth,
+                'max_queue': self.max_queue,
+                **self.counters,
+                'latency': latency,
+            }
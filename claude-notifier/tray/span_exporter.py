@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Session Span Exporter
+=====================
+Turns hook events into trace spans and exports them as OTLP-JSON, so
+trace tooling can show where a session's time goes:
+
+    turn (UserPromptSubmit -> Stop)
+      tool: Bash  (PreToolUse -> PostToolUse)
+      tool: Task  (PreToolUse -> PostToolUse), SubagentStop as a span event
+
+Configured in the tray's config.json, disabled when absent:
+
+    "spans": {"dir": "spans"}                                   # one OTLP-JSON file per batch
+    "spans": {"url": "http://localhost:4318/v1/traces"}         # POST to a collector
+
+Span times come from the hook's start time (hook_ts) when the message
+carries one, so the PowerShell bridge's delivery delay doesn't skew
+durations. Tool calls that arrive over the bridge get no tool span: their
+end event is only sent over the direct socket.
+
+Finished spans go into a bounded buffer (oldest dropped when full) that a
+background thread exports in batches, so handling an event only costs a
+few dict operations.
+"""
+
+import os
+import json
+import time
+import socket
+import secrets
+import threading
+from collections import deque, OrderedDict
+from pathlib import Path
+
+from webhooks import Destination, WebhookError
+
+MAX_BUFFER = 2048  # Finished spans waiting for export
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 5.0  # Seconds before a partial batch is exported
+MAX_FILES = 200  # Oldest span files are deleted beyond this
+MAX_OPEN_SPANS = 1000  # Open turns and tool calls kept across all sessions
+MAX_CLOCK_SKEW = 60.0  # Seconds; a hook_ts further from the tray clock is ignored
+
+SPAN_KIND_INTERNAL = 1
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def attributes(values):
+    """OTLP attribute list from a dict, skipping empty values"""
+    result = []
+    for key, value in values.items():
+        if value is None or value == "":
+            continue
+        if isinstance(value, bool):
+            result.append({'key': key, 'value': {'boolValue': value}})
+        elif isinstance(value, int):
+            result.append({'key': key, 'value': {'intValue': str(value)}})
+        else:
+            result.append({'key': key, 'value': {'stringValue': str(value)}})
+    return result
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start_ns', 'end_ns', 'attrs', 'events', 'status')
+
+    def __init__(self, trace_id, name, start_ns, parent_id=None, attrs=None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.attrs = attrs or {}
+        self.events = []
+        self.status = STATUS_UNSET
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': SPAN_KIND_INTERNAL,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': attributes(self.attrs),
+            'status': {'code': self.status},
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.events:
+            span['events'] = [{'timeUnixNano': str(ts), 'name': name, 'attributes': attributes(attrs)}
+                              for ts, name, attrs in self.events]
+        return span
+
+
+class SpanBuilder:
+    """Keeps the open turn and tool spans per session, hands finished spans to `on_span`"""
+
+    def __init__(self, on_span):
+        self.on_span = on_span
+        self.turns = OrderedDict()  # session_id -> open turn Span
+        self.tools = OrderedDict()  # tool_use_id -> open tool Span
+        self.lock = threading.Lock()
+
+    def on_event(self, event):
+        name = event.get('event')
+        session_id = event.get('session_id') or None
+        now = time.time_ns()
+        hook_ts = event.get('hook_ts')
+        if isinstance(hook_ts, (int, float)) and abs(now / 1e9 - hook_ts) < MAX_CLOCK_SKEW:
+            now = int(hook_ts * 1e9)
+        finished = []
+        with self.lock:
+            if name == "UserPromptSubmit":
+                # A new prompt closes a turn that never saw its Stop
+                finished += self._end_turn(session_id, now, complete=False)
+                self._start_turn(session_id, now)
+            elif name == "PreToolUse" and event.get('tool_use_id') and not event.get('bridged'):
+                turn = self.turns.get(session_id) or self._start_turn(session_id, now)
+                self.tools[event['tool_use_id']] = Span(
+                    turn.trace_id, f"tool: {event.get('tool') or 'unknown'}", now, parent_id=turn.span_id,
+                    attrs={'claude.session_id': session_id, 'claude.tool': event.get('tool'),
+                           'claude.tool_use_id': event['tool_use_id']})
+            elif name in ["PostToolUse", "PostToolUseFailure"] and event.get('tool_use_id'):
+                span = self.tools.pop(event['tool_use_id'], None)
+                if span is not None:
+                    span.end_ns = now
+                    span.status = STATUS_ERROR if name == "PostToolUseFailure" else STATUS_OK
+                    finished.append(span)
+            elif name in ["SubagentStop", "Notification"]:
+                turn = self.turns.get(session_id)
+                if turn is not None:
+                    turn.events.append((now, name, {'claude.tool': event.get('tool')}))
+            elif name == "Stop":
+                finished += self._end_turn(session_id, now, complete=True)
+            self._evict(finished, now)
+        for span in finished:
+            self.on_span(span)
+
+    def _start_turn(self, session_id, now):
+        turn = Span(secrets.token_hex(16), "turn", now, attrs={'claude.session_id': session_id})
+        self.turns[session_id] = turn
+        return turn
+
+    def _end_turn(self, session_id, now, complete):
+        """Close a session's turn and any of its tool spans still open (lock held)"""
+        turn = self.turns.pop(session_id, None)
+        if turn is None:
+            return []
+        finished = []
+        for tool_use_id in [i for i, span in self.tools.items() if span.trace_id == turn.trace_id]:
+            span = self.tools.pop(tool_use_id)
+            span.end_ns = now
+            span.attrs['claude.incomplete'] = True
+            finished.append(span)
+        turn.end_ns = now
+        turn.status = STATUS_OK if complete else STATUS_UNSET
+        if not complete:
+            turn.attrs['claude.incomplete'] = True
+        finished.append(turn)
+        return finished
+
+    def _evict(self, finished, now):
+        """Close the oldest open spans beyond MAX_OPEN_SPANS (lock held)"""
+        while len(self.turns) + len(self.tools) > MAX_OPEN_SPANS:
+            if self.tools:
+                _, span = self.tools.popitem(last=False)
+                span.end_ns = now
+                span.attrs['claude.incomplete'] = True
+                finished.append(span)
+            else:
+                finished += self._end_turn(next(iter(self.turns)), now, complete=False)
+
+
+class SpanExporter:
+    def __init__(self, config, base_dir=None, max_buffer=MAX_BUFFER, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.directory = None
+        self.destination = None
+        if config.get('dir'):
+            self.directory = Path(base_dir or '.') / config['dir']
+        elif config.get('url'):
+            try:
+                self.destination = Destination({'url': config['url'], 'headers': config.get('headers', {})})
+            except ValueError as e:
+                print(f"Ignoring span export config: {e}")
+        self.enabled = self.directory is not None or self.destination is not None
+        self.max_files = config.get('max_files', MAX_FILES)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = deque(maxlen=max_buffer)
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.sequence = 0
+        self.resource = {'attributes': attributes({'service.name': 'claude-notifier',
+                                                   'host.name': socket.gethostname()})}
+        self.counters = {'spans': 0, 'dropped': 0, 'exported': 0, 'batches': 0, 'errors': 0, 'last_error': None}
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=3.0):
+        """Export what is buffered and stop"""
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+        if self.destination:
+            self.destination.close()
+
+    def add(self, span):
+        """Queue a finished span for export"""
+        with self.cond:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.counters['dropped'] += 1
+            self.buffer.append(span)
+            self.counters['spans'] += 1
+            if len(self.buffer) >= self.batch_size:
+                self.cond.notify_all()
+
+    def _next_batch(self):
+        """Wait for a full batch or the flush interval (None when stopped and empty)"""
+        with self.cond:
+            deadline = time.monotonic() + self.flush_interval
+            while self.running and len(self.buffer) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.cond.wait(remaining)
+            if not self.buffer:
+                return None if not self.running else []
+            count = min(self.batch_size, len(self.buffer))
+            return [self.buffer.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if batch:
+                self.export(batch)
+
+    def export(self, spans):
+        body = json.dumps({'resourceSpans': [{
+            'resource': self.resource,
+            'scopeSpans': [{'scope': {'name': 'claude-notifier.tray'},
+                            'spans': [span.to_otlp() for span in spans]}],
+        }]}).encode()
+        try:
+            if self.directory is not None:
+                self._write_file(body)
+            else:
+                self.destination.post(body)
+            self.counters['exported'] += len(spans)
+            self.counters['batches'] += 1
+        except (OSError, WebhookError) as e:
+            # Spans are diagnostics, a failed batch is counted and dropped
+            self.counters['errors'] += 1
+            self.counters['last_error'] = str(e)
+            print(f"Span export failed: {e}")
+
+    def _write_file(self, body):
+        """Write one batch atomically and prune the oldest files"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sequence += 1
+        path = self.directory / f"spans-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.sequence:05d}.json"
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        files = sorted(self.directory.glob('spans-*.json'), key=lambda p: (p.stat().st_mtime, p.name))
+        for old in files[:-self.max_files]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
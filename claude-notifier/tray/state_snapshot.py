@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tray State Snapshots
+====================
+Compact binary snapshots of the tray's in-memory state, so a restarted
+tray comes back with its status, sessions, counters and latency
+histograms instead of a blank "standby".
+
+File layout: a fixed header followed by zlib-compressed JSON.
+
+    magic    4s   b'CTRS'
+    version  H
+    flags    H    reserved, 0
+    saved_at d    time.time() when written
+    length   I    compressed payload size
+    crc32    I    of the compressed payload
+
+Writes go to a temporary file that replaces the snapshot atomically, so a
+crash mid-write leaves the previous snapshot intact.
+"""
+
+import os
+import json
+import time
+import zlib
+import struct
+
+MAGIC = b'CTRS'
+VERSION = 1
+HEADER = struct.Struct('<4sHHdII')
+COMPRESS_LEVEL = 6
+
+
+def save_snapshot(path, state):
+    """Write `state` (JSON-serialisable) atomically, returns the file size"""
+    payload = zlib.compress(json.dumps(state, separators=(',', ':')).encode(), COMPRESS_LEVEL)
+    header = HEADER.pack(MAGIC, VERSION, 0, time.time(), len(payload), zlib.crc32(payload))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return HEADER.size + len(payload)
+
+
+def load_snapshot(path):
+    """Return (saved_at, state), or None if there is no usable snapshot"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return None
+            magic, version, _, saved_at, length, crc = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                print(f"Ignoring state snapshot {path}: unknown format")
+                return None
+            payload = f.read(length)
+    except OSError:
+        return None
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        print(f"Ignoring state snapshot {path}: truncated or corrupt")
+        return None
+    try:
+        return saved_at, json.loads(zlib.decompress(payload))
+    except (zlib.error, ValueError) as e:
+        print(f"Ignoring state snapshot {path}: {e}")
+        return None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Claude Status Client
+====================
+Small consumer for status bars and scripts.
+
+    python status_client.py              # print the current status from status.json
+    python status_client.py --follow     # subscribe and print one JSON event per line
+    python status_client.py --follow --coalesce 500
+
+Polling the status file never touches the tray socket, so any number of
+widgets can call it cheaply (e.g. from a tmux status line).
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+from pathlib import Path
+
+TRAY_PORT = 12345
+STATUS_FILE = Path(__file__).parent / 'status.json'
+STALE_AFTER = 120  # Seconds without a status file update before "unknown" is reported
+
+
+def read_status(status_file=STATUS_FILE):
+    """Return the overall status from the status file"""
+    try:
+        with open(status_file, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return "unknown"
+    if time.time() - state.get('updated', 0) > STALE_AFTER and state.get('status') == "working":
+        # The tray may have died mid-task; don't show a stuck "working"
+        return "unknown"
+    return state.get('status', "unknown")
+
+
+def follow(host, port, coalesce_ms):
+    """Subscribe to the tray and print events until the connection closes"""
+    with socket.create_connection((host, port), timeout=5) as s:
+        s.settimeout(None)
+        command = f"subscribe {coalesce_ms}" if coalesce_ms else "subscribe"
+        s.sendall(command.encode())
+        for line in s.makefile('r', encoding='utf-8'):
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read or follow Claude's status")
+    parser.add_argument("--follow", action="store_true", help="stream events from the tray")
+    parser.add_argument("--coalesce", type=int, default=0, help="coalescing window in ms for --follow")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=TRAY_PORT)
+    args = parser.parse_args()
+
+    if not args.follow:
+        print(read_status())
+        return
+    try:
+        follow(args.host, args.port, args.coalesce)
+    except (OSError, KeyboardInterrupt) as e:
+        if not isinstance(e, KeyboardInterrupt):
+            print(f"Connection to tray failed: {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Status Subscription Stream
+==========================
+Pushes status and session changes to long-lived subscribers (tmux status
+line, polybar, editor plugins) as newline-delimited JSON, and mirrors the
+current state into a small status file for consumers that can only poll.
+The file is rewritten on every change and at least once per heartbeat.
+
+A client subscribes by connecting to the tray port and sending
+"subscribe" or "subscribe <coalesce_ms>". It first receives a snapshot
+event, then one JSON object per line:
+
+    {"type": "snapshot", "status": "working", "sessions": {...}, "ts": ...}
+    {"type": "status", "status": "standby", "previous": "working", "ts": ...}
+    {"type": "session", "session_id": "...", "status": "working", "event": "PreToolUse", ...}
+    {"type": "heartbeat", "ts": ...}
+
+With coalescing, only the latest status event and the latest event per
+session are sent once per window.
+"""
+
+import os
+import json
+import time
+import socket
+import threading
+from collections import deque
+
+HEARTBEAT_INTERVAL = 15.0  # Seconds, lets dead subscribers be detected
+MAX_OUTBOX = 256  # Events buffered per subscriber before it is dropped as too slow
+SEND_TIMEOUT = 0.5
+STATUS_FILE_INTERVAL = 0.2  # Minimum seconds between status file writes
+
+
+class Subscriber:
+    def __init__(self, sock, coalesce_ms):
+        self.sock = sock
+        self.coalesce = coalesce_ms / 1000.0
+        self.outbox = deque()
+        self.pending = {}  # Coalescing key -> latest event
+        self.due = None
+
+    def offer(self, event):
+        """Queue an event, returns False if the subscriber has fallen too far behind"""
+        if self.coalesce:
+            key = (event['type'], event.get('session_id'))
+            self.pending[key] = event
+            if self.due is None:
+                self.due = time.monotonic() + self.coalesce
+            return True
+        if len(self.outbox) >= MAX_OUTBOX:
+            return False
+        self.outbox.append(event)
+        return True
+
+    def take_ready(self, now):
+        """Events ready to send now"""
+        events = list(self.outbox)
+        self.outbox.clear()
+        if self.due is not None and now >= self.due:
+            events.extend(self.pending.values())
+            self.pending.clear()
+            self.due = None
+        return events
+
+
+class StatusStream:
+    def __init__(self, snapshot_fn, status_file=None):
+        self.snapshot_fn = snapshot_fn
+        self.status_file = status_file
+        self.subscribers = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._file_dirty = status_file is not None
+        self._file_written = 0.0
+        self.counters = {
+            'subscribed': 0,
+            'dropped': 0,
+            'events': 0,
+            'file_writes': 0,
+        }
+
+    def start(self):
+        """Start the delivery thread"""
+        self._running = True
+        threading.Thread(target=self._run, name="status-stream", daemon=True).start()
+
+    def stop(self):
+        """Stop delivery and close all subscriber connections"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def subscribe(self, sock, coalesce_ms=0):
+        """Take ownership of a client socket and start streaming to it"""
+        sock.settimeout(SEND_TIMEOUT)
+        subscriber = Subscriber(sock, max(0, coalesce_ms))
+        # The snapshot always goes out immediately, even with coalescing
+        subscriber.outbox.append({'type': 'snapshot', **self.snapshot_fn(), 'ts': time.time()})
+        with self._cond:
+            self.subscribers.append(subscriber)
+            self.counters['subscribed'] += 1
+            self._cond.notify_all()
+
+    def publish(self, event):
+        """Send an event to every subscriber and refresh the status file"""
+        event.setdefault('ts', time.time())
+        with self._cond:
+            self.counters['events'] += 1
+            for subscriber in list(self.subscribers):
+                if not subscriber.offer(event):
+                    self._drop(subscriber)
+            if self.status_file is not None:
+                self._file_dirty = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {'subscribers': len(self.subscribers), **self.counters}
+
+    def _drop(self, subscriber):
+        """Remove a subscriber (lock held)"""
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+            self.counters['dropped'] += 1
+            try:
+                subscriber.sock.close()
+            except OSError:
+                pass
+
+    def _next_wakeup(self, now, last_heartbeat):
+        """Seconds until the delivery thread has something to do (lock held)"""
+        deadlines = [last_heartbeat + HEARTBEAT_INTERVAL]
+        for subscriber in self.subscribers:
+            if subscriber.outbox:
+                return 0
+            if subscriber.due is not None:
+                deadlines.append(subscriber.due)
+        if self._file_dirty:
+            deadlines.append(self._file_written + STATUS_FILE_INTERVAL)
+        return max(0, min(deadlines) - now)
+
+    def _run(self):
+        last_heartbeat = time.monotonic()
+        while True:
+            with self._cond:
+                if not self._running:
+                    break
+                wait = self._next_wakeup(time.monotonic(), last_heartbeat)
+                if wait > 0:
+                    self._cond.wait(wait)
+                if not self._running:
+                    break
+
+                now = time.monotonic()
+                heartbeat = now - last_heartbeat >= HEARTBEAT_INTERVAL
+                if heartbeat:
+                    last_heartbeat = now
+                    if self.status_file is not None:
+                        # Keeps 'updated' fresh through long tool runs so pollers don't report "unknown"
+                        self._file_dirty = True
+                batches = []
+                for subscriber in self.subscribers:
+                    events = subscriber.take_ready(now)
+                    if heartbeat and not events:
+                        events = [{'type': 'heartbeat', 'ts': time.time()}]
+                    if events:
+                        batches.append((subscriber, events))
+                write_file = self._file_dirty and now - self._file_written >= STATUS_FILE_INTERVAL
+
+            # Socket and file I/O happen outside the lock so publish() never waits on them
+            for subscriber, events in batches:
+                payload = "".join(json.dumps(event) + "\n" for event in events).encode()
+                try:
+                    subscriber.sock.sendall(payload)
+                except (OSError, socket.timeout):
+                    with self._cond:
+                        self._drop(subscriber)
+            if write_file:
+                self._write_status_file()
+
+        with self._cond:
+            for subscriber in list(self.subscribers):
+                self._drop(subscriber)
+
+    def _write_status_file(self):
+        """Atomically replace the status file with the current snapshot"""
+        with self._cond:
+            self._file_dirty = False
+            self._file_written = time.monotonic()
+        state = {**self.snapshot_fn(), 'updated': time.time()}
+        tmp_path = f"{self.status_file}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.status_file)
+            self.counters['file_writes'] += 1
+        except OSError as e:
+            print(f"Failed to write status file: {e}")
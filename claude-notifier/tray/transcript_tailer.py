@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Incremental Transcript Tailer
+=============================
+Keeps running per-session statistics (turns, tool calls, token usage) from
+Claude Code transcript JSONL files without re-reading them.
+
+For every transcript the byte offset of the last complete line is stored;
+an update seeks there and parses only the lines appended since. Offsets
+and counters are persisted together so a tray restart resumes where it
+left off.
+"""
+
+import os
+import json
+import threading
+
+READ_CHUNK = 1024 * 1024  # Bytes read per call while catching up
+MAX_TRANSCRIPTS = 200  # Oldest entries are forgotten beyond this
+
+USAGE_FIELDS = {
+    'input_tokens': 'input_tokens',
+    'output_tokens': 'output_tokens',
+    'cache_read_input_tokens': 'cache_read_tokens',
+    'cache_creation_input_tokens': 'cache_creation_tokens',
+}
+
+
+def new_stats():
+    return {
+        'turns': 0,
+        'tool_calls': 0,
+        'assistant_messages': 0,
+        'input_tokens': 0,
+        'output_tokens': 0,
+        'cache_read_tokens': 0,
+        'cache_creation_tokens': 0,
+        'bad_lines': 0,
+    }
+
+
+def is_user_turn(entry):
+    """A user entry with real input, not just tool results or meta messages"""
+    if entry.get('isMeta'):
+        return False
+    content = (entry.get('message') or {}).get('content')
+    if isinstance(content, str):
+        return True
+    if isinstance(content, list):
+        return any(isinstance(item, dict) and item.get('type') != 'tool_result' for item in content)
+    return False
+
+
+class TranscriptTailer:
+    def __init__(self, state_file=None):
+        self.state_file = state_file
+        self.transcripts = {}  # path -> {'session_id', 'offset', 'last_message_id', 'stats'}
+        self.lock = threading.Lock()
+        self.counters = {'updates': 0, 'bytes_read': 0, 'lines': 0, 'errors': 0, 'resets': 0}
+        self.load()
+
+    def load(self):
+        """Load persisted offsets and counters"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r') as f:
+                self.transcripts = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to load transcript state: {e}")
+
+    def save(self):
+        """Persist offsets and counters atomically"""
+        if not self.state_file:
+            return
+        with self.lock:
+            data = json.dumps(self.transcripts)
+        tmp_path = f"{self.state_file}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            print(f"Failed to save transcript state: {e}")
+
+    def update(self, session_id, path):
+        """Parse lines appended to the transcript since the last call, returns the session stats"""
+        with self.lock:
+            entry = self.transcripts.get(path)
+            if entry is None:
+                entry = {'session_id': session_id, 'offset': 0, 'last_message_id': None, 'stats': new_stats()}
+                self.transcripts[path] = entry
+                self._evict()
+            self.counters['updates'] += 1
+            # Work on a copy so readers of the stats never wait on file I/O
+            work = {**entry, 'stats': dict(entry['stats'])}
+        start_offset = work['offset']
+
+        counts = {'bytes_read': 0, 'lines': 0, 'errors': 0, 'resets': 0}
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < work['offset']:
+                    # Truncated or replaced: start over
+                    counts['resets'] += 1
+                    work.update(offset=0, last_message_id=None, stats=new_stats())
+                f.seek(work['offset'])
+                self._consume(f, work, counts)
+        except OSError:
+            counts['errors'] += 1
+
+        with self.lock:
+            for name, value in counts.items():
+                self.counters[name] += value
+            # Another update of the same transcript may have finished first, keep its result
+            if self.transcripts.get(path) is entry and entry['offset'] == start_offset:
+                entry.update(offset=work['offset'], last_message_id=work['last_message_id'], stats=work['stats'])
+            return dict(entry['stats'])
+
+    def _consume(self, f, entry, counts):
+        """Read complete lines from the current position, leaving a partial last line for later"""
+        remainder = b''
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            counts['bytes_read'] += len(chunk)
+            lines = (remainder + chunk).split(b'\n')
+            remainder = lines.pop()
+            for line in lines:
+                entry['offset'] += len(line) + 1
+                if line.strip():
+                    counts['lines'] += 1
+                    self._parse_line(line, entry)
+
+    def _parse_line(self, line, entry):
+        stats = entry['stats']
+        try:
+            record = json.loads(line)
+        except ValueError:
+            stats['bad_lines'] += 1
+            return
+        if not isinstance(record, dict):
+            return
+
+        kind = record.get('type')
+        if kind == 'user':
+            if is_user_turn(record):
+                stats['turns'] += 1
+        elif kind == 'assistant':
+            message = record.get('message') or {}
+            content = message.get('content')
+            if isinstance(content, list):
+                stats['tool_calls'] += sum(1 for item in content
+                                           if isinstance(item, dict) and item.get('type') == 'tool_use')
+
+            # One API message is written as several lines that repeat the same usage
+            message_id = message.get('id')
+            if message_id is None or message_id != entry['last_message_id']:
+                entry['last_message_id'] = message_id
+                stats['assistant_messages'] += 1
+                usage = message.get('usage') or {}
+                for field, stat in USAGE_FIELDS.items():
+                    value = usage.get(field)
+                    if isinstance(value, int):
+                        stats[stat] += value
+
+    def _evict(self):
+        """Forget the oldest transcripts beyond MAX_TRANSCRIPTS (lock held)"""
+        while len(self.transcripts) > MAX_TRANSCRIPTS:
+            del self.transcripts[next(iter(self.transcripts))]
+
+    def session_stats(self, session_id):
+        """Stats for a session, or None if none of its transcripts have been read"""
+        with self.lock:
+            for entry in self.transcripts.values():
+                if entry['session_id'] == session_id:
+                    return dict(entry['stats'])
+        return None
+
+    def all_stats(self):
+        """Stats per session id"""
+        with self.lock:
+            return {entry['session_id']: dict(entry['stats']) for entry in self.transcripts.values()}
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Stuck Tool Watchdog
+===================
+Tracks in-flight tool calls (PreToolUse without a PostToolUse yet) and
+reports the ones that run longer than their threshold: a hung Bash
+command, or a tool waiting on a permission prompt nobody has seen.
+
+Timeouts live in a hashed timer wheel: a ring of slots, one per tick,
+where a timer is filed under the slot it expires in together with the
+number of full rotations still to wait. Adding and cancelling a timer
+are dict operations, and each tick only looks at one slot, so thousands
+of outstanding calls cost the same per tick as a handful.
+
+Thresholds are seconds per tool name, configured in config.json:
+
+    "tool_thresholds": {"default": 300, "Bash": 600, "Task": 3600}
+"""
+
+import math
+import time
+import threading
+
+TICK = 1.0  # Seconds per wheel slot
+WHEEL_SLOTS = 512  # One rotation covers about 8.5 minutes at the default tick
+MAX_IN_FLIGHT = 10000  # Oldest calls are forgotten beyond this
+
+DEFAULT_THRESHOLDS = {
+    'default': 300.0,
+    'Task': 3600.0,  # Subagents legitimately run for a long time
+}
+
+
+def format_duration(seconds):
+    """Short human readable duration for alerts and the menu"""
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+class TimerWheel:
+    def __init__(self, slots=WHEEL_SLOTS):
+        self.slots = [dict() for _ in range(slots)]
+        self.position = 0  # Index of the slot handled by the next tick
+        self.index = {}  # key -> slot number, for O(1) cancel
+
+    def __len__(self):
+        return len(self.index)
+
+    def add(self, key, ticks):
+        """Schedule `key` to expire once at least `ticks` whole ticks have passed.
+
+        The tick in progress is already partly over, so it is not counted:
+        the timer is filed one slot past `ticks` and never fires early.
+        """
+        self.cancel(key)
+        ticks = max(1, math.ceil(ticks))
+        slot = (self.position + ticks) % len(self.slots)
+        # Rotations the timer has to wait before its slot counts
+        self.slots[slot][key] = ticks // len(self.slots)
+        self.index[key] = slot
+
+    def cancel(self, key):
+        """Remove a timer, returns False if it was not scheduled"""
+        slot = self.index.pop(key, None)
+        if slot is None:
+            return False
+        del self.slots[slot][key]
+        return True
+
+    def tick(self):
+        """Advance one slot, returns the keys that expired"""
+        bucket = self.slots[self.position]
+        self.position = (self.position + 1) % len(self.slots)
+        expired = []
+        for key, rounds in list(bucket.items()):
+            if rounds:
+                bucket[key] = rounds - 1
+            else:
+                del bucket[key]
+                del self.index[key]
+                expired.append(key)
+        return expired
+
+
+class ToolWatchdog:
+    def __init__(self, thresholds=None, on_stuck=None, on_clear=None, tick=TICK):
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.on_stuck = on_stuck
+        self.on_clear = on_clear
+        self.tick = tick
+        self.wheel = TimerWheel()
+        self.calls = {}  # tool_use_id -> {'session_id', 'tool', 'started'}
+        self.stuck = {}  # tool_use_id -> call, for calls past their threshold
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self.counters = {'started': 0, 'finished': 0, 'stuck': 0, 'cleared': 0, 'forgotten': 0}
+
+    def start(self):
+        self._stop.clear()
+        threading.Thread(target=self._run, name="tool-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def threshold(self, tool):
+        return self.thresholds.get(tool, self.thresholds['default'])
+
+    def tool_started(self, tool_use_id, session_id, tool, started=None):
+        """Start timing a tool call (`started` is set when restoring a call from a snapshot)"""
+        with self.lock:
+            if tool_use_id in self.calls:
+                # Duplicate PreToolUse, keep the original start time
+                return
+            started = started or time.time()
+            self.calls[tool_use_id] = {'session_id': session_id, 'tool': tool, 'started': started}
+            remaining = self.threshold(tool) - (time.time() - started)
+            self.wheel.add(tool_use_id, remaining / self.tick)
+            self.counters['started'] += 1
+            while len(self.calls) > MAX_IN_FLIGHT:
+                self._forget(next(iter(self.calls)))
+
+    def tool_finished(self, tool_use_id):
+        """Stop timing a tool call, clearing its alert if it was stuck"""
+        with self.lock:
+            call = self.calls.pop(tool_use_id, None)
+            if call is None:
+                return
+            self.wheel.cancel(tool_use_id)
+            self.counters['finished'] += 1
+            was_stuck = self.stuck.pop(tool_use_id, None) is not None
+            if was_stuck:
+                self.counters['cleared'] += 1
+        if was_stuck and self.on_clear:
+            self.on_clear(tool_use_id, call)
+
+    def session_stopped(self, session_id):
+        """A session's turn ended, none of its calls can still be running"""
+        with self.lock:
+            ids = [tool_use_id for tool_use_id, call in self.calls.items() if call['session_id'] == session_id]
+        for tool_use_id in ids:
+            self.tool_finished(tool_use_id)
+
+    def _forget(self, tool_use_id):
+        """Drop a call without reporting it (lock held)"""
+        self.calls.pop(tool_use_id, None)
+        self.stuck.pop(tool_use_id, None)
+        self.wheel.cancel(tool_use_id)
+        self.counters['forgotten'] += 1
+
+    def _run(self):
+        next_tick = time.monotonic() + self.tick
+        while not self._stop.wait(max(0, next_tick - time.monotonic())):
+            # Catch up on ticks missed while the machine was busy or asleep
+            while next_tick <= time.monotonic():
+                self.advance()
+                next_tick += self.tick
+
+    def advance(self):
+        """Process one tick of the wheel and report newly stuck calls"""
+        with self.lock:
+            expired = []
+            for tool_use_id in self.wheel.tick():
+                call = self.calls.get(tool_use_id)
+                if call is not None:
+                    self.stuck[tool_use_id] = call
+                    self.counters['stuck'] += 1
+                    expired.append((tool_use_id, call))
+        if self.on_stuck:
+            for tool_use_id, call in expired:
+                self.on_stuck(tool_use_id, call)
+
+    def export_calls(self):
+        """In-flight calls, for state snapshots"""
+        with self.lock:
+            return {tool_use_id: dict(call) for tool_use_id, call in self.calls.items()}
+
+    def stuck_calls(self):
+        """Stuck calls, longest running first"""
+        now = time.time()
+        with self.lock:
+            calls = [{'tool_use_id': tool_use_id, 'session_id': call['session_id'], 'tool': call['tool'],
+                      'running_s': round(now - call['started'])}
+                     for tool_use_id, call in self.stuck.items()]
+        return sorted(calls, key=lambda call: call['running_s'], reverse=True)
+
+    def stats(self):
+        with self.lock:
+            return {'in_flight': len(self.calls), 'stuck_now': len(self.stuck), **self.counters}
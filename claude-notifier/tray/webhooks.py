@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Webhook Dispatcher
+==================
+Forwards selected hook events (Stop, Notification, ...) to team chat or
+incident tooling from the long-running tray, so the short-lived hook
+processes never pay for HTTP connection setup.
+
+Destinations are configured in the tray's config.json:
+
+    "webhooks": [
+        {"url": "https://chat.example.com/hooks/abc", "events": ["Stop", "Notification"],
+         "format": "slack", "batch_window": 2.0, "max_batch": 20}
+    ]
+
+Each destination has its own worker thread, a persistent (keep-alive)
+HTTP connection, a bounded queue that drops the oldest events when full,
+a batching window, and retries with exponential backoff.
+
+Formats: "events" posts {"source": "claude-notifier", "events": [...]},
+"slack" posts {"text": "..."} with one line per event.
+
+bench/webhook_server.py is a local stand-in server; its --check mode runs
+the dispatcher against it (batching, keep-alive reuse, retries).
+"""
+
+import json
+import time
+import random
+import socket
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+DEFAULT_EVENTS = ["Stop", "Notification"]
+DEFAULT_BATCH_WINDOW = 2.0
+DEFAULT_MAX_BATCH = 20
+MAX_QUEUE = 500  # Events buffered per destination
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0  # Seconds, doubled per retry
+BACKOFF_MAX = 30.0
+REQUEST_TIMEOUT = 5.0
+
+
+class WebhookError(Exception):
+    def __init__(self, message, retry=True, retry_after=None):
+        super().__init__(message)
+        self.retry = retry
+        self.retry_after = retry_after
+
+
+def format_text(event):
+    """One readable line for chat destinations"""
+    line = f"Claude {event.get('event', 'event')}"
+    if event.get('tool'):
+        line += f" ({event['tool']})"
+    if event.get('session_id'):
+        line += f" - session {event['session_id'][:8]}"
+    return line
+
+
+class Destination:
+    def __init__(self, config):
+        self.url = config['url']
+        parts = urlsplit(self.url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported webhook URL: {self.url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        # Webhook URLs often embed secrets, only the host is shown in stats and logs
+        self.name = parts.netloc.rsplit('@', 1)[-1]
+        if parts.query:
+            self.path += "?" + parts.query
+
+        self.events = set(config.get('events', DEFAULT_EVENTS))
+        self.format = config.get('format', 'events')
+        self.headers = {'Content-Type': 'application/json', **config.get('headers', {})}
+        self.batch_window = config.get('batch_window', DEFAULT_BATCH_WINDOW)
+        self.max_batch = config.get('max_batch', DEFAULT_MAX_BATCH)
+
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.connection = None
+        self.thread = None
+        self.stats = {
+            'queued': 0,
+            'dropped': 0,
+            'sent_batches': 0,
+            'sent_events': 0,
+            'failed_batches': 0,
+            'retries': 0,
+            'connections': 0,
+            'last_latency_ms': None,
+            'last_error': None,
+        }
+
+    def wants(self, event):
+        return '*' in self.events or event.get('event') in self.events
+
+    def body(self, batch):
+        if self.format == 'slack':
+            return json.dumps({'text': "\n".join(format_text(event) for event in batch)}).encode()
+        return json.dumps({'source': 'claude-notifier', 'host': socket.gethostname(), 'events': batch}).encode()
+
+    def connect(self):
+        """Return the pooled connection, opening a new one if needed"""
+        if self.connection is None:
+            # Imported here: http.client pulls in ssl and email, too slow for tray startup
+            import http.client
+            if self.scheme == "https":
+                self.connection = http.client.HTTPSConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+            else:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+            self.stats['connections'] += 1
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def post(self, body):
+        """POST one batch over the persistent connection"""
+        import http.client
+        for reconnect in (True, False):
+            reused = self.connection is not None
+            try:
+                connection = self.connect()
+                connection.request("POST", self.path, body=body, headers=self.headers)
+                response = connection.getresponse()
+                # The body must be read completely before the connection can be reused
+                response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                # A kept-alive connection the server already closed: retry at once on a new one
+                if not (reused and reconnect):
+                    raise WebhookError(f"{type(e).__name__}: {e}")
+
+        if response.getheader('Connection', '').lower() == 'close':
+            self.close()
+        if 200 <= response.status < 300:
+            return
+        retry_after = response.getheader('Retry-After')
+        # A server asking for a long wait would stall the whole queue, cap it like our own backoff
+        retry_after = min(BACKOFF_MAX, float(retry_after)) if retry_after and retry_after.isdigit() else None
+        # Client errors other than rate limiting won't succeed on retry
+        retry = response.status == 429 or response.status >= 500
+        raise WebhookError(f"HTTP {response.status}", retry=retry, retry_after=retry_after)
+
+
+class WebhookDispatcher:
+    def __init__(self, configs, max_queue=MAX_QUEUE, max_retries=MAX_RETRIES, backoff=BACKOFF_BASE):
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.running = False
+        self.destinations = []
+        for config in configs:
+            try:
+                self.destinations.append(Destination(config))
+            except (KeyError, ValueError) as e:
+                print(f"Ignoring webhook config: {type(e).__name__} {e}")
+
+    def start(self):
+        """Start one worker per destination"""
+        self.running = True
+        for destination in self.destinations:
+            destination.thread = threading.Thread(target=self._worker, args=(destination,),
+                                                  name=f"webhook-{destination.name}", daemon=True)
+            destination.thread.start()
+
+    def stop(self, timeout=3.0):
+        """Send what is queued (without waiting for batch windows) and stop"""
+        self.running = False
+        for destination in self.destinations:
+            with destination.cond:
+                destination.cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for destination in self.destinations:
+            if destination.thread:
+                destination.thread.join(max(0, deadline - time.monotonic()))
+            destination.close()
+
+    def dispatch(self, event):
+        """Queue an event for every destination that subscribes to it"""
+        for destination in self.destinations:
+            if not destination.wants(event):
+                continue
+            with destination.cond:
+                if len(destination.queue) >= self.max_queue:
+                    destination.queue.popleft()
+                    destination.stats['dropped'] += 1
+                destination.queue.append(event)
+                destination.stats['queued'] += 1
+                destination.cond.notify_all()
+
+    def _next_batch(self, destination):
+        """Wait for events, then for the batch window to fill (None when stopped and empty)"""
+        with destination.cond:
+            while not destination.queue:
+                if not self.running:
+                    return None
+                destination.cond.wait()
+            deadline = time.monotonic() + destination.batch_window
+            while self.running and len(destination.queue) < destination.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                destination.cond.wait(remaining)
+            count = min(destination.max_batch, len(destination.queue))
+            return [destination.queue.popleft() for _ in range(count)]
+
+    def _worker(self, destination):
+        while True:
+            batch = self._next_batch(destination)
+            if batch is None:
+                return
+            self._send(destination, batch)
+
+    def _send(self, destination, batch):
+        """Deliver a batch, retrying with exponential backoff"""
+        body = destination.body(batch)
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                destination.post(body)
+                destination.stats['last_latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                destination.stats['sent_batches'] += 1
+                destination.stats['sent_events'] += len(batch)
+                destination.stats['last_error'] = None
+                return
+            except WebhookError as e:
+                destination.stats['last_error'] = str(e)
+                if not e.retry or attempt == self.max_retries or not self.running:
+                    break
+                destination.stats['retries'] += 1
+                delay = min(BACKOFF_MAX, e.retry_after or self.backoff * 2 ** attempt)
+                # Jitter keeps several trays from retrying in lockstep
+                time.sleep(delay * random.uniform(0.8, 1.2))
+        destination.stats['failed_batches'] += 1
+        print(f"Webhook {destination.name} dropped {len(batch)} events: {destination.stats['last_error']}")
+
+    def stats(self):
+        return [{'destination': destination.name, 'depth': len(destination.queue), **destination.stats}
+                for destination in self.destinations]
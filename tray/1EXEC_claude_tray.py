@@ -5,35 +5,68 @@ Claude Status Tray Icon
 Shows Claude's working status in the system tray
 - Yellow (flashing) = Working
 - Green = Standby/Ready
+
+Run with --headless to start only the status server. PIL and pystray are
+imported lazily, so headless mode works on machines without a display.
 """
 
+import time
+PROCESS_START = time.perf_counter()  # Reference point for the startup budget
+
 import sys
 import socket
 import threading
-import time
 import json
+import argparse
+import signal
 from pathlib import Path
-from PIL import Image, ImageDraw
-import pystray
-from pystray import MenuItem, Menu
+
+# GUI modules, loaded on first use by load_gui_modules()
+Image = ImageDraw = pystray = Menu = MenuItem = None
 
 # Configuration
 LISTEN_PORT = 12345
 ICON_SIZE = 64
 CONFIG_FILE = Path(__file__).parent.parent / "config.json"
+STARTUP_BUDGET_MS = 150  # Module import to listener ready
+
+def load_gui_modules():
+    """Import PIL and pystray the first time the tray icon is needed"""
+    global Image, ImageDraw, pystray, Menu, MenuItem
+    if pystray is None:
+        from PIL import Image as _Image, ImageDraw as _ImageDraw
+        import pystray as _pystray
+        Image, ImageDraw = _Image, _ImageDraw
+        Menu, MenuItem = _pystray.Menu, _pystray.MenuItem
+        pystray = _pystray
 
 class ClaudeTrayApp:
-    def __init__(self):
+    def __init__(self, headless=False, port=LISTEN_PORT):
         self.status = "standby"
         self.icon = None
         self.running = True
+        self.headless = headless
+        self.port = port
         self.flash_state = False
         self.logging_enabled = True
         
+        # Server metrics, reported by the get_metrics command
+        self.started_at = time.time()
+        self.startup_ms = None
+        self.listener_ready = threading.Event()
+        self.metrics = {
+            'messages': 0,
+            'status_changes': 0,
+            'config_requests': 0,
+            'errors': 0,
+        }
+        
         # Load config
         self.load_config()
         
-        # Create icons
+    def load_icons(self):
+        """Create the tray icons"""
+        load_gui_modules()
         self.green_icon = self.create_icon_image((0, 255, 0))
         self.yellow_icon = self.create_icon_image((255, 255, 0))
         self.yellow_dark_icon = self.create_icon_image((128, 128, 0))
@@ -72,31 +105,61 @@ class ClaudeTrayApp:
         """Listen for status updates from the hook handler"""
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind(("127.0.0.1", LISTEN_PORT))
+        server_socket.bind(("127.0.0.1", self.port))
         server_socket.listen(1)
         server_socket.settimeout(1)  # 1 second timeout for checking self.running
         
-        print(f"Status listener started on port {LISTEN_PORT}")
+        self.startup_ms = (time.perf_counter() - PROCESS_START) * 1000
+        self.listener_ready.set()
+        print(f"Status listener started on port {self.port} (ready in {self.startup_ms:.0f} ms)")
+        if self.startup_ms > STARTUP_BUDGET_MS:
+            print(f"WARNING: startup took {self.startup_ms:.0f} ms, budget is {STARTUP_BUDGET_MS} ms")
         
         while self.running:
             try:
                 client_socket, addr = server_socket.accept()
-                data = client_socket.recv(1024).decode()
-                if data in ["working", "standby"]:
-                    self.status = data
-                    print(f"Status changed to: {self.status}")
-                elif data == "get_config":
-                    # Send config back to hook handler
-                    config = {'logging_enabled': self.logging_enabled}
-                    client_socket.send(json.dumps(config).encode())
-                client_socket.close()
             except socket.timeout:
                 continue
+            try:
+                # Don't let a silent client stall the listener
+                client_socket.settimeout(1)
+                data = client_socket.recv(1024).decode()
+                self.handle_message(data, client_socket)
             except Exception as e:
+                self.metrics['errors'] += 1
                 print(f"Listener error: {e}")
+            finally:
+                client_socket.close()
         
         server_socket.close()
     
+    def handle_message(self, data, client_socket):
+        """Handle a single message received by the listener"""
+        self.metrics['messages'] += 1
+        if data in ["working", "standby"]:
+            if data != self.status:
+                self.metrics['status_changes'] += 1
+            self.status = data
+            print(f"Status changed to: {self.status}")
+        elif data == "get_config":
+            # Send config back to hook handler
+            self.metrics['config_requests'] += 1
+            config = {'logging_enabled': self.logging_enabled}
+            client_socket.send(json.dumps(config).encode())
+        elif data == "get_metrics":
+            client_socket.send(json.dumps(self.get_metrics()).encode())
+    
+    def get_metrics(self):
+        """Return server state and counters"""
+        return {
+            'status': self.status,
+            'headless': self.headless,
+            'uptime': round(time.time() - self.started_at, 1),
+            'startup_ms': round(self.startup_ms, 1) if self.startup_ms is not None else None,
+            'startup_budget_ms': STARTUP_BUDGET_MS,
+            **self.metrics,
+        }
+    
     def icon_updater(self):
         """Update icon appearance in a separate thread"""
         while self.running:
@@ -140,8 +203,30 @@ class ClaudeTrayApp:
         status = "enabled" if self.logging_enabled else "disabled"
         icon.notify(f"Logging {status}", "Claude Notifier")
     
+    def stop(self, *args):
+        """Stop the status server (headless mode)"""
+        self.running = False
+    
+    def run_headless(self):
+        """Run only the status server, without a tray icon"""
+        listener_thread = threading.Thread(target=self.status_listener, daemon=True)
+        listener_thread.start()
+        
+        try:
+            while self.running and listener_thread.is_alive():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            self.running = False
+        listener_thread.join(timeout=2)
+    
     def run(self):
         """Run the system tray application"""
+        if self.headless:
+            self.run_headless()
+            return
+        
+        self.load_icons()
+        
         # Start listener thread
         listener_thread = threading.Thread(target=self.status_listener, daemon=True)
         listener_thread.start()
@@ -168,11 +253,43 @@ class ClaudeTrayApp:
         
         self.icon.run()
 
+def check_startup(port=LISTEN_PORT):
+    """Start the headless server, report startup time and exit"""
+    app = ClaudeTrayApp(headless=True, port=port)
+    listener_thread = threading.Thread(target=app.status_listener, daemon=True)
+    listener_thread.start()
+    if not app.listener_ready.wait(timeout=5):
+        print("Listener did not start")
+        return 1
+    app.running = False
+    within_budget = app.startup_ms <= STARTUP_BUDGET_MS
+    print(f"Startup: {app.startup_ms:.1f} ms (budget {STARTUP_BUDGET_MS} ms) - "
+          f"{'OK' if within_budget else 'OVER BUDGET'}")
+    print(f"GUI modules loaded: {'PIL' in sys.modules or 'pystray' in sys.modules}")
+    return 0 if within_budget else 1
+
 def main():
+    parser = argparse.ArgumentParser(description="Claude status tray")
+    parser.add_argument("--headless", action="store_true",
+                        help="run only the status server (no tray icon)")
+    parser.add_argument("--port", type=int, default=LISTEN_PORT,
+                        help=f"port to listen on (default {LISTEN_PORT})")
+    parser.add_argument("--check-startup", action="store_true",
+                        help="measure headless startup time against the budget and exit")
+    args = parser.parse_args()
+    
+    if args.check_startup:
+        sys.exit(check_startup(args.port))
+    
+    if args.headless:
+        app = ClaudeTrayApp(headless=True, port=args.port)
+        signal.signal(signal.SIGTERM, app.stop)
+        app.run()
+        return
+    
     # Check if required libraries are available
     try:
-        import PIL
-        import pystray
+        load_gui_modules()
     except ImportError:
         print("Required libraries not found. Installing...")
         import subprocess
@@ -180,7 +297,7 @@ def main():
         print("Libraries installed. Please restart the application.")
         return
     
-    app = ClaudeTrayApp()
+    app = ClaudeTrayApp(port=args.port)
     app.run()
 
 if __name__ == "__main__":